@@ -0,0 +1,347 @@
+"""Capa de acceso a datos asyncio para Ecotech Solutions
+
+Expone DatabaseAsync y versiones async de las clases de clases.py con los
+mismos nombres de métodos, para servir muchas peticiones concurrentes desde
+un solo proceso sin bloquear el event loop.
+
+No agrega dependencias: cada operación (E/S de MySQL, cifrado AES, bcrypt)
+se ejecuta tal cual en un ThreadPoolExecutor propio, y un asyncio.Semaphore
+del tamaño del pool de conexiones limita cuántas corren a la vez, así las
+corrutinas esperan turno en el event loop en vez de bloquear hilos.
+
+    async with DatabaseAsync(pool_max=10) as db:
+        empleados = await EmpleadosAsync.listar_empleados(db)
+        async with db.transaccion():
+            proyecto = ProyectoAsync(db, nombre="Huerto solar")
+            await proyecto.crear_proyecto()
+            await RegistroDeTiempoAsync(db, horas=4, id_empleado=1,
+                                        id_proyecto=proyecto.id_proyecto).registrar_tiempo()
+"""
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from itertools import islice
+
+from conexiondb import Database
+from clases import Empleados, Usuario, Departamento, Proyecto, RegistroDeTiempo
+
+# (DatabaseAsync, ejecutor de un hilo) de la transacción activa en la tarea
+_TRANSACCION = ContextVar("transaccion_async", default=None)
+
+
+class DatabaseAsync:
+    """Fachada asyncio de Database
+
+    Los atributos que no define se delegan en la Database síncrona (`sync`),
+    de modo que los métodos de clases.py funcionan sin cambios cuando se
+    ejecutan en los hilos del ejecutor. Desde el event loop solo deben
+    usarse los métodos async.
+    """
+
+    def __init__(self, pool_min=1, pool_max=5, tiempo_ocioso=30, db=None):
+        self.sync = db if db is not None else Database(
+            pool_min=pool_min, pool_max=pool_max, tiempo_ocioso=tiempo_ocioso)
+        self.max_concurrentes = pool_max
+        # Un turno por conexión del pool: ningún hilo queda esperando al pool
+        self.__semaforo = asyncio.Semaphore(pool_max)
+        self.__ejecutor = ThreadPoolExecutor(
+            max_workers=pool_max, thread_name_prefix="db-async")
+        self.__en_curso = 0
+        self.__stats = {"operaciones": 0, "esperas": 0, "transacciones": 0}
+
+    def __getattr__(self, nombre):
+        if nombre == "sync":
+            raise AttributeError(nombre)
+        return getattr(self.sync, nombre)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_):
+        await self.desconectar()
+
+    def _ejecutor_transaccion(self):
+        """Ejecutor de la transacción activa de esta base en la tarea actual"""
+        actual = _TRANSACCION.get()
+        if actual is not None and actual[0] is self:
+            return actual[1]
+        return None
+
+    @asynccontextmanager
+    async def _turno(self):
+        """Espera un lugar libre en el pool sin bloquear el event loop"""
+        if self.__semaforo.locked():
+            self.__stats["esperas"] += 1
+        async with self.__semaforo:
+            self.__en_curso += 1
+            try:
+                yield
+            finally:
+                self.__en_curso -= 1
+
+    async def en_hilo(self, funcion, *args, **kwargs):
+        """Ejecuta una función bloqueante en el ejecutor y espera su resultado
+
+        Dentro de transaccion() se usa el hilo de la transacción, que ya
+        tiene su turno, para que todas las operaciones compartan conexión.
+        """
+        self.__stats["operaciones"] += 1
+        return await self._en_turno(functools.partial(funcion, *args, **kwargs))
+
+    @staticmethod
+    def _siguiente_lote(generador, tamano_lote, convertir):
+        lote = list(islice(generador, tamano_lote))
+        return [convertir(x) for x in lote] if convertir else lote
+
+    async def _en_turno(self, funcion, *args):
+        """Como en_hilo, sin contar como operación"""
+        loop = asyncio.get_running_loop()
+        ejecutor = self._ejecutor_transaccion()
+        if ejecutor is not None:
+            return await loop.run_in_executor(ejecutor, funcion, *args)
+        async with self._turno():
+            return await loop.run_in_executor(self.__ejecutor, funcion, *args)
+
+    async def iterar(self, generador, tamano_lote=500, convertir=None):
+        """Recorre un generador síncrono de clases.py de a lotes, fuera del loop
+
+        El turno se toma solo mientras se lee cada lote, así el cuerpo del
+        `async for` puede hacer otras operaciones sobre la base. Ojo:
+        generadores como iterar_reporte retienen una conexión del pool
+        hasta terminar, por lo que cada recorrido abierto ocupa una.
+        """
+        try:
+            while True:
+                lote = await self._en_turno(
+                    self._siguiente_lote, generador, tamano_lote, convertir)
+                if not lote:
+                    return
+                for elemento in lote:
+                    yield elemento
+        finally:
+            if hasattr(generador, "close"):
+                await self._en_turno(generador.close)
+
+    @asynccontextmanager
+    async def transaccion(self):
+        """Versión async de Database.transaccion()
+
+        Las operaciones del bloque se ejecutan en un hilo dedicado que
+        mantiene la conexión de la transacción. Al salir se comporta como
+        la versión síncrona: un único commit, o rollback y se relanza la
+        excepción del bloque (TransaccionAbortada si la falla se capturó
+        dentro). Un bloque anidado se une a la transacción externa.
+        """
+        if self._ejecutor_transaccion() is not None:
+            yield
+            return
+
+        loop = asyncio.get_running_loop()
+        async with self._turno():
+            ejecutor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="db-transaccion")
+            gestor = self.sync.transaccion()
+            try:
+                transaccion = await loop.run_in_executor(ejecutor, gestor.__enter__)
+                self.__stats["transacciones"] += 1
+                token = _TRANSACCION.set((self, ejecutor))
+                try:
+                    yield transaccion
+                except BaseException as e:
+                    _TRANSACCION.reset(token)
+                    await loop.run_in_executor(
+                        ejecutor, gestor.__exit__, type(e), e, e.__traceback__)
+                    raise
+                _TRANSACCION.reset(token)
+                await loop.run_in_executor(ejecutor, gestor.__exit__, None, None, None)
+            finally:
+                ejecutor.shutdown(wait=False)
+
+    async def create_tables(self):
+        """Conecta y crea el esquema (incluye migraciones)"""
+        def crear():
+            self.sync.conectar()
+            self.sync.create_tables()
+        await self.en_hilo(crear)
+
+    async def verificar_indices(self):
+        return await self.en_hilo(self.sync.verificar_indices)
+
+    def estadisticas(self):
+        """Uso de la capa async junto con las estadísticas del pool"""
+        stats = dict(self.__stats)
+        stats["en_curso"] = self.__en_curso
+        stats["max_concurrentes"] = self.max_concurrentes
+        stats["pool"] = self.sync.estadisticas_pool()
+        return stats
+
+    async def desconectar(self):
+        """Cierra el pool y el ejecutor"""
+        await asyncio.get_running_loop().run_in_executor(
+            self.__ejecutor, self.sync.desconectar)
+        self.__ejecutor.shutdown(wait=True)
+
+
+# ============ Envolturas de los métodos síncronos ============
+
+# Clase síncrona -> su versión async, para convertir lo que devuelven
+_CLASES_ASYNC = {}
+
+
+def _version_async(clase):
+    """Registra una clase async como reemplazo de su clase base síncrona"""
+    _CLASES_ASYNC[clase.__bases__[0]] = clase
+    return clase
+
+
+def _slots(clase):
+    return [slot for base in clase.__mro__ for slot in getattr(base, "__slots__", ())]
+
+
+def _a_async(objeto):
+    """Copia una entidad síncrona en una instancia de su clase async"""
+    clase = _CLASES_ASYNC.get(type(objeto))
+    if clase is None:
+        return objeto
+    nuevo = clase.__new__(clase)
+    if hasattr(objeto, "__dict__"):
+        nuevo.__dict__.update(objeto.__dict__)
+    for slot in _slots(type(objeto)):
+        if hasattr(objeto, slot):
+            setattr(nuevo, slot, getattr(objeto, slot))
+    return nuevo
+
+
+def _convertir(resultado):
+    """Convierte entidades sueltas, en listas o como valores de dicts"""
+    if isinstance(resultado, list):
+        return [_a_async(x) for x in resultado]
+    if isinstance(resultado, dict):
+        return {clave: _a_async(valor) for clave, valor in resultado.items()}
+    return _a_async(resultado)
+
+
+def _metodo(metodo):
+    """Método de instancia async; usa la base de datos de la entidad"""
+    @functools.wraps(metodo)
+    async def envoltura(self, *args, **kwargs):
+        return await self.db.en_hilo(metodo, self, *args, **kwargs)
+    return envoltura
+
+
+def _estatico(funcion, convertir=False):
+    """Método estático async que recibe la DatabaseAsync como primer argumento"""
+    if convertir:
+        original = funcion
+        funcion = functools.wraps(original)(
+            lambda *args, **kwargs: _convertir(original(*args, **kwargs)))
+
+    @functools.wraps(funcion)
+    async def envoltura(db, *args, **kwargs):
+        return await db.en_hilo(funcion, db, *args, **kwargs)
+    return staticmethod(envoltura)
+
+
+def _de_clase(funcion):
+    """Método de clase async; `cls` es la clase async"""
+    @functools.wraps(funcion)
+    async def envoltura(cls, db, *args, **kwargs):
+        return await db.en_hilo(funcion, cls, db, *args, **kwargs)
+    return classmethod(envoltura)
+
+
+def _iterador(funcion, convertir=False):
+    """Generador síncrono como generador async, leído de a lotes"""
+    @functools.wraps(funcion)
+    async def envoltura(db, *args, **kwargs):
+        generador = funcion(db, *args, **kwargs)
+        async for elemento in db.iterar(
+                generador, convertir=_a_async if convertir else None):
+            yield elemento
+    return staticmethod(envoltura)
+
+
+# ==================== Clases async ====================
+
+@_version_async
+class EmpleadosAsync(Empleados):
+    """Empleados con métodos async"""
+    __slots__ = ()
+
+    registrar_empleado = _metodo(Empleados.registrar_empleado)
+    actualizar_empleado = _metodo(Empleados.actualizar_empleado)
+    registrar_lote = _estatico(Empleados.registrar_lote)
+    importar_csv = _estatico(Empleados.importar_csv)
+    listar_empleados = _estatico(Empleados.listar_empleados, convertir=True)
+    buscar_por_id = _estatico(Empleados.buscar_por_id, convertir=True)
+    buscar_por_ids = _estatico(Empleados.buscar_por_ids, convertir=True)
+    eliminar_empleado = _estatico(Empleados.eliminar_empleado)
+    iterar_empleados = _iterador(Empleados.iterar_empleados, convertir=True)
+
+    @staticmethod
+    async def descifrar_lote(empleados):
+        """Descifra el lote en el ejecutor (AES es trabajo de CPU)"""
+        if not empleados:
+            return empleados
+        return await empleados[0].db.en_hilo(Empleados.descifrar_lote, empleados)
+
+
+@_version_async
+class UsuarioAsync(Usuario):
+    """Usuario con métodos async"""
+
+    autenticar = _metodo(Usuario.autenticar)
+    iniciar_sesion = _metodo(Usuario.iniciar_sesion)
+    cerrar_sesion = _metodo(Usuario.cerrar_sesion)
+    autorizar = _metodo(Usuario.autorizar)
+    actualizar_usuario = _metodo(Usuario.actualizar_usuario)
+    registrar_usuario = _metodo(Usuario.registrar_usuario)
+    desde_sesion = _de_clase(Usuario.desde_sesion.__func__)
+    autorizar_id = _de_clase(Usuario.autorizar_id.__func__)
+    cargar_roles = _de_clase(Usuario.cargar_roles.__func__)
+    listar_usuarios = _estatico(Usuario.listar_usuarios)
+
+
+@_version_async
+class DepartamentoAsync(Departamento):
+    """Departamento con métodos async"""
+    __slots__ = ()
+
+    crear_departamento = _metodo(Departamento.crear_departamento)
+    actualizar_departamento = _metodo(Departamento.actualizar_departamento)
+    listar_departamentos = _estatico(Departamento.listar_departamentos, convertir=True)
+    buscar_por_id = _estatico(Departamento.buscar_por_id, convertir=True)
+    buscar_por_ids = _estatico(Departamento.buscar_por_ids, convertir=True)
+    eliminar_departamento = _estatico(Departamento.eliminar_departamento)
+
+
+@_version_async
+class ProyectoAsync(Proyecto):
+    """Proyecto con métodos async"""
+    __slots__ = ()
+
+    crear_proyecto = _metodo(Proyecto.crear_proyecto)
+    editar_proyecto = _metodo(Proyecto.editar_proyecto)
+    listar_proyectos = _estatico(Proyecto.listar_proyectos, convertir=True)
+    buscar_por_ids = _estatico(Proyecto.buscar_por_ids, convertir=True)
+    eliminar_proyecto = _estatico(Proyecto.eliminar_proyecto)
+
+
+@_version_async
+class RegistroDeTiempoAsync(RegistroDeTiempo):
+    """RegistroDeTiempo con métodos async"""
+    __slots__ = ()
+
+    registrar_tiempo = _metodo(RegistroDeTiempo.registrar_tiempo)
+    registrar_lote = _estatico(RegistroDeTiempo.registrar_lote)
+    importar_archivo = _estatico(RegistroDeTiempo.importar_archivo)
+    listar_registros = _estatico(RegistroDeTiempo.listar_registros, convertir=True)
+    consultar_registro = _estatico(RegistroDeTiempo.consultar_registro, convertir=True)
+    reporte = _estatico(RegistroDeTiempo.reporte)
+    iterar_reporte = _iterador(RegistroDeTiempo.iterar_reporte)
+    horas_por_empleado = _estatico(RegistroDeTiempo.horas_por_empleado)
+    horas_por_proyecto = _estatico(RegistroDeTiempo.horas_por_proyecto)
+    horas_por_mes = _estatico(RegistroDeTiempo.horas_por_mes)
+    horas_por_empleado_proyecto = _estatico(RegistroDeTiempo.horas_por_empleado_proyecto)
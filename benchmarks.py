@@ -0,0 +1,201 @@
+"""Benchmarks de rendimiento del sistema (no requieren base de datos)
+
+Uso:
+    python benchmarks.py aes [n]
+    python benchmarks.py memoria [n]
+    python benchmarks.py listados [n]
+"""
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from operator import itemgetter
+from types import SimpleNamespace
+
+from clases import (_aes_encrypt_ecb, _aes_decrypt_ecb,
+                    _aes_encrypt_lote, _aes_decrypt_lote,
+                    Empleados, Departamento, Proyecto, RegistroDeTiempo,
+                    FilaUsuario)
+from indicadores import RegistroIndicador
+
+
+def _medir(funcion, *args):
+    """Ejecuta una función y devuelve (resultado, segundos)"""
+    inicio = time.perf_counter()
+    resultado = funcion(*args)
+    return resultado, time.perf_counter() - inicio
+
+
+def benchmark_aes(n=50000):
+    """Compara el cifrado AES valor a valor contra las variantes por lote"""
+    valores = [f"Calle Los Aromos {i}, Santiago" for i in range(n)]
+
+    cifrados, t_uno = _medir(lambda: [_aes_encrypt_ecb(v) for v in valores])
+    cifrados_lote, t_lote = _medir(_aes_encrypt_lote, valores)
+    assert cifrados == cifrados_lote
+
+    textos, t_uno_d = _medir(lambda: [_aes_decrypt_ecb(b) for b in cifrados])
+    textos_lote, t_lote_d = _medir(_aes_decrypt_lote, cifrados)
+    assert textos == textos_lote == valores
+
+    print(f"\n=== AES-128-ECB ({n:,} valores) ===")
+    print(f"{'Operación':<12}{'Por valor':>16}{'Por lote':>16}{'Mejora':>10}")
+    for nombre, uno, lote in (("Cifrar", t_uno, t_lote),
+                              ("Descifrar", t_uno_d, t_lote_d)):
+        print(f"{nombre:<12}{n / uno:>12,.0f} v/s{n / lote:>12,.0f} v/s"
+              f"{uno / lote:>9.1f}x")
+
+
+# Filas sintéticas tal como las entrega un cursor de tuplas,
+# en el orden de las columnas de cada listado
+
+def _fila_empleado(i):
+    """Fila de Empleados con el tamaño típico de los campos cifrados"""
+    return (i + 1000, f"Empleado {i}", b"%032d" % i, b"%016d" % i, b"%032d" % i,
+            date(2020, 1, 1) + timedelta(days=i % 1000), Decimal("850000.00") + i)
+
+
+def _fila_registro(i):
+    """Fila de RegistrodeTiempo"""
+    return (i + 1000, date(2024, 1, 1) + timedelta(days=i % 365), 7,
+            f"Tarea {i}", 1000 + i % 500, 1000 + i % 50)
+
+
+def _fila_departamento(i):
+    return (i + 1000, f"Departamento {i}", f"Gerente {i}", 1000 + i % 500, 1000 + i % 50)
+
+
+def _fila_proyecto(i):
+    return (i + 1000, f"Proyecto {i}", f"Descripción del proyecto {i}",
+            date(2024, 1, 1), None)
+
+
+def _fila_usuario(i):
+    return (i + 1000, f"usuario{i}", "user", i + 1000)
+
+
+def _fila_indicador(i):
+    return (i + 1000, "Dólar observado", date(2024, 1, 1) + timedelta(days=i % 365),
+            Decimal("950.1200"), datetime(2024, 6, 1, 12, 0), "admin",
+            "https://mindicador.cl")
+
+
+def _bytes_por_fila(construir, generar_fila, n):
+    """Memoria retenida por fila al construir n objetos (incluye sus valores)"""
+    tracemalloc.start()
+    objetos = [construir(generar_fila(i)) for i in range(n)]
+    retenido, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objetos
+    return retenido / n
+
+
+def benchmark_memoria(n=1_000_000):
+    """Compara bytes por fila: dict del cursor, objeto con __dict__ y con __slots__"""
+    def como_dict(columnas):
+        return lambda fila: dict(zip(columnas, fila))
+
+    variantes = {
+        "Empleado": (_fila_empleado, {
+            "dict (cursor)": como_dict(Empleados.COLUMNAS),
+            "objeto __dict__": lambda fila: SimpleNamespace(
+                db=None, _descifrados={}, **dict(zip(Empleados.COLUMNAS, fila))),
+            "objeto __slots__": lambda fila: Empleados._desde_fila(None, fila),
+        }),
+        "Registro de tiempo": (_fila_registro, {
+            "dict (cursor)": como_dict(RegistroDeTiempo.COLUMNAS),
+            "objeto __dict__": lambda fila: SimpleNamespace(
+                db=None, **dict(zip(RegistroDeTiempo.COLUMNAS, fila))),
+            "objeto __slots__": lambda fila: RegistroDeTiempo._desde_fila(None, fila),
+        }),
+    }
+
+    print(f"\n=== Memoria por fila ({n:,} filas) ===")
+    print(f"{'Entidad':<20}{'Representación':<20}{'Bytes/fila':>12}{'Total':>12}")
+    for entidad, (generar_fila, construcciones) in variantes.items():
+        for nombre, construir in construcciones.items():
+            por_fila = _bytes_por_fila(construir, generar_fila, n)
+            print(f"{entidad:<20}{nombre:<20}{por_fila:>12,.0f}"
+                  f"{por_fila * n / 2 ** 20:>9,.0f} MB")
+
+
+def benchmark_listados(n=200_000, repeticiones=5):
+    """Mapeo de filas por listado: cursor de diccionarios vs cursor de tuplas
+
+    "Antes" reproduce lo que hacía cada listado con dictionary=True: el
+    driver arma un dict por fila (dict(zip(columnas, fila))) y el listado
+    lo recorre por nombre de columna, o lo devuelve tal cual. "Después"
+    recibe la tupla y la desempaqueta en orden. La conversión de tipos del
+    driver es igual en ambos casos y no se mide. Los bytes por fila cuentan
+    solo la estructura creada, no los valores, que son compartidos.
+    """
+    def antes(columnas, construir):
+        por_nombre = itemgetter(*columnas)
+        return lambda filas: [construir(por_nombre(dict(zip(columnas, fila))))
+                              for fila in filas]
+
+    def despues(construir):
+        return lambda filas: [construir(fila) for fila in filas]
+
+    def sin_mapeo(columnas):
+        # Los listados que devolvían el dict del cursor sin convertirlo
+        return lambda filas: [dict(zip(columnas, fila)) for fila in filas]
+
+    def bytes_por_fila(mapeo, filas):
+        tracemalloc.start()
+        resultado = mapeo(filas)
+        retenido, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del resultado
+        return retenido / len(filas)
+
+    listados = [
+        ("Empleados.listar_empleados", _fila_empleado,
+         antes(Empleados.COLUMNAS, lambda f: Empleados._desde_fila(None, f)),
+         despues(lambda f: Empleados._desde_fila(None, f))),
+        ("Departamento.listar_departamentos", _fila_departamento,
+         antes(Departamento.COLUMNAS, lambda f: Departamento._desde_fila(None, f)),
+         despues(lambda f: Departamento._desde_fila(None, f))),
+        ("Proyecto.listar_proyectos", _fila_proyecto,
+         antes(Proyecto.COLUMNAS, lambda f: Proyecto._desde_fila(None, f)),
+         despues(lambda f: Proyecto._desde_fila(None, f))),
+        ("RegistroDeTiempo.listar_registros", _fila_registro,
+         antes(RegistroDeTiempo.COLUMNAS, lambda f: RegistroDeTiempo._desde_fila(None, f)),
+         despues(lambda f: RegistroDeTiempo._desde_fila(None, f))),
+        ("Usuario.listar_usuarios", _fila_usuario,
+         sin_mapeo(FilaUsuario._fields),
+         lambda filas: list(map(FilaUsuario._make, filas))),
+        ("IndicadorEconomico.listar_registros", _fila_indicador,
+         sin_mapeo(RegistroIndicador._fields),
+         lambda filas: list(map(RegistroIndicador._make, filas))),
+    ]
+
+    print(f"\n=== Mapeo de filas por listado ({n:,} filas, mejor de {repeticiones}) ===")
+    print(f"{'Listado':<38}{'Antes':>14}{'Después':>14}{'Mejora':>9}"
+          f"{'B/fila antes':>14}{'B/fila después':>16}")
+    for nombre, generar_fila, mapeo_antes, mapeo_despues in listados:
+        filas = [generar_fila(i) for i in range(n)]
+        t_antes = min(_medir(mapeo_antes, filas)[1] for _ in range(repeticiones))
+        t_despues = min(_medir(mapeo_despues, filas)[1] for _ in range(repeticiones))
+        print(f"{nombre:<38}{n / t_antes:>10,.0f} f/s{n / t_despues:>10,.0f} f/s"
+              f"{t_antes / t_despues:>8.1f}x"
+              f"{bytes_por_fila(mapeo_antes, filas):>14,.0f}"
+              f"{bytes_por_fila(mapeo_despues, filas):>16,.0f}")
+
+
+BENCHMARKS = {
+    "aes": benchmark_aes,
+    "memoria": benchmark_memoria,
+    "listados": benchmark_listados,
+}
+
+
+if __name__ == "__main__":
+    nombre = sys.argv[1] if len(sys.argv) > 1 else "aes"
+    if nombre not in BENCHMARKS:
+        print(f"Benchmark desconocido: {nombre}. "
+              f"Disponibles: {', '.join(BENCHMARKS)}")
+        sys.exit(1)
+    argumentos = [int(a) for a in sys.argv[2:]]
+    BENCHMARKS[nombre](*argumentos)
@@ -1,14 +1,48 @@
 """Constructor de clases con seguridad"""
 import bcrypt  # Para hash de contraseñas con sal
 from mysql.connector import Error
+import csv
+import hashlib
+import json
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
 from datetime import date, datetime
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.primitives import padding
 
+from conexiondb import Database
+
+# Marca de "no encontrado" para cachés donde None es un valor válido
+_SIN_VALOR = object()
+
+
+def _entero_de_entorno(nombre, defecto, minimo=None, maximo=None):
+    """Lee un entero de una variable de entorno; si es inválido usa `defecto`."""
+    valor = os.environ.get(nombre)
+    if valor is None:
+        return defecto
+    try:
+        numero = int(valor)
+    except ValueError:
+        numero = None
+    if (numero is None or (minimo is not None and numero < minimo)
+            or (maximo is not None and numero > maximo)):
+        print(f"Advertencia: {nombre}={valor!r} no es válido, se usa {defecto}")
+        return defecto
+    return numero
+
 # Clave AES de 16 bytes
 
 AES_KEY = b'Mi_Clave_AES_128'
 
+# Contexto de cifrado reutilizable: cada operación solo crea su encryptor/decryptor
+_AES_CIPHER = Cipher(algorithms.AES(AES_KEY), modes.ECB())
+
 
 def _aes_encrypt_ecb(plaintext: str) -> bytes:
     """Cifra texto con AES-128-ECB + PKCS7."""
@@ -18,19 +52,24 @@ def _aes_encrypt_ecb(plaintext: str) -> bytes:
     padder = padding.PKCS7(128).padder()
     padded = padder.update(data) + padder.finalize()
 
-    cipher = Cipher(algorithms.AES(AES_KEY), modes.ECB())
-    encryptor = cipher.encryptor()
+    encryptor = _AES_CIPHER.encryptor()
     ct = encryptor.update(padded) + encryptor.finalize()
     return ct
 
 
+def _a_bytes(blob):
+    """Devuelve a bytes un BLOB que el conector entregó decodificado"""
+    if isinstance(blob, str):
+        return blob.encode("utf-8")
+    return blob
+
+
 def _aes_decrypt_ecb(blob: bytes) -> str:
     """Descifra dato AES-128-ECB + PKCS7"""
     if not blob:
         return ""
     try:
-        cipher = Cipher(algorithms.AES(AES_KEY), modes.ECB())
-        decryptor = cipher.decryptor()
+        decryptor = _AES_CIPHER.decryptor()
         padded = decryptor.update(blob) + decryptor.finalize()
 
         unpadder = padding.PKCS7(128).unpadder()
@@ -41,9 +80,204 @@ def _aes_decrypt_ecb(blob: bytes) -> str:
         return ""
 
 
+def _aes_encrypt_lote(valores) -> list:
+    """Cifra una lista de textos con un único contexto AES-128-ECB + PKCS7.
+
+    En ECB cada bloque se cifra de forma independiente, por lo que cifrar
+    los textos rellenados y concatenados produce los mismos bytes que
+    cifrarlos uno a uno.
+    """
+    datos = [None if v is None else v.encode("utf-8") for v in valores]
+    buffer = bytearray()
+    for dato in datos:
+        if dato is not None:
+            relleno = 16 - len(dato) % 16
+            buffer += dato
+            buffer += bytes([relleno]) * relleno
+
+    encryptor = _AES_CIPHER.encryptor()
+    ct = encryptor.update(bytes(buffer)) + encryptor.finalize()
+
+    cifrados = []
+    pos = 0
+    for dato in datos:
+        if dato is None:
+            cifrados.append(None)
+            continue
+        largo = (len(dato) // 16 + 1) * 16
+        cifrados.append(ct[pos:pos + largo])
+        pos += largo
+    return cifrados
+
+
+def _aes_decrypt_lote(blobs) -> list:
+    """Descifra una lista de blobs con un único contexto AES-128-ECB.
+
+    Los blobs válidos se descifran en un solo buffer contiguo y luego se
+    les quita el relleno PKCS7 por separado. Igual que _aes_decrypt_ecb,
+    un blob vacío o inválido produce "".
+    """
+    validos = [bool(b) and len(b) % 16 == 0 for b in blobs]
+    buffer = b"".join(b for b, ok in zip(blobs, validos) if ok)
+    decryptor = _AES_CIPHER.decryptor()
+    padded = decryptor.update(buffer) + decryptor.finalize()
+
+    textos = []
+    pos = 0
+    for blob, ok in zip(blobs, validos):
+        if not ok:
+            if blob:
+                print("Error descifrando datos: largo de bloque inválido")
+            textos.append("")
+            continue
+        bloque = padded[pos:pos + len(blob)]
+        pos += len(blob)
+        relleno = bloque[-1]
+        if not 1 <= relleno <= 16 or bloque[-relleno:] != bytes([relleno]) * relleno:
+            print("Error descifrando datos: relleno inválido")
+            textos.append("")
+            continue
+        try:
+            textos.append(bloque[:-relleno].decode("utf-8"))
+        except UnicodeDecodeError as e:
+            print(f"Error descifrando datos: {e}")
+            textos.append("")
+    return textos
+
+
+# Máximo de IDs por consulta WHERE ... IN (...)
+TAMANO_BLOQUE_IN = 1000
+
+
+def _filas_por_ids(db, sql_select, columna, ids):
+    """Lee filas (tuplas) por clave primaria con WHERE ... IN, en bloques."""
+    ids = list(dict.fromkeys(ids))
+    filas = []
+    with db.conexion() as connection, \
+            closing(connection.cursor()) as cursor:
+        for inicio in range(0, len(ids), TAMANO_BLOQUE_IN):
+            bloque = ids[inicio:inicio + TAMANO_BLOQUE_IN]
+            marcadores = ", ".join(["%s"] * len(bloque))
+            cursor.execute(
+                f"{sql_select} WHERE {columna} IN ({marcadores})",
+                tuple(bloque))
+            filas.extend(cursor.fetchall())
+    return filas
+
+
+def _filas_con_cache(db, cache, sql_select, columna, ids):
+    """Lee filas por clave primaria pasando por `cache`; devuelve {id: fila}.
+
+    La clave primaria debe ser la primera columna de `sql_select`. Si solo
+    falta una fila se lee con la sentencia preparada; si faltan varias, con
+    _filas_por_ids. Con `cache` None siempre se consulta la base de datos.
+    """
+    encontradas = {}
+    faltantes = []
+    for id_fila in ids:
+        row = cache.obtener(id_fila) if cache is not None else None
+        if row is not None:
+            encontradas[id_fila] = row
+        else:
+            faltantes.append(id_fila)
+
+    if len(faltantes) == 1:
+        with db.conexion() as connection:
+            cursor = db.preparada(
+                connection, f"{sql_select} WHERE {columna} = %s", (faltantes[0],))
+            # fetchall deja la conexión sin resultados pendientes
+            leidas = cursor.fetchall()
+    elif faltantes:
+        leidas = _filas_por_ids(db, sql_select, columna, faltantes)
+    else:
+        leidas = []
+
+    for row in leidas:
+        encontradas[row[0]] = row
+        if cache is not None:
+            cache.guardar(row[0], row)
+    return encontradas
+
+
+class CacheLRU:
+    """Caché en memoria acotada (LRU) con vencimiento opcional y contadores."""
+
+    def __init__(self, max_elementos=1024, ttl=None):
+        self.max_elementos = max_elementos
+        self.ttl = ttl
+        self.__datos = OrderedDict()  # clave -> (valor, vence)
+        self.__lock = threading.Lock()
+        self.__aciertos = 0
+        self.__fallos = 0
+
+    def obtener(self, clave, defecto=None):
+        """Devuelve el valor guardado, o `defecto` si no está o venció."""
+        with self.__lock:
+            entrada = self.__datos.get(clave)
+            if entrada is not None and (entrada[1] is None or entrada[1] > time.monotonic()):
+                self.__datos.move_to_end(clave)
+                self.__aciertos += 1
+                return entrada[0]
+            if entrada is not None:
+                del self.__datos[clave]
+            self.__fallos += 1
+            return defecto
+
+    def guardar(self, clave, valor):
+        """Guarda un valor, descartando el menos usado si se llena."""
+        vence = time.monotonic() + self.ttl if self.ttl else None
+        with self.__lock:
+            self.__datos[clave] = (valor, vence)
+            self.__datos.move_to_end(clave)
+            while len(self.__datos) > self.max_elementos:
+                self.__datos.popitem(last=False)
+
+    def invalidar(self, clave):
+        """Elimina una clave de la caché."""
+        with self.__lock:
+            self.__datos.pop(clave, None)
+
+    def limpiar(self):
+        """Vacía la caché."""
+        with self.__lock:
+            self.__datos.clear()
+
+    def estadisticas(self):
+        """Aciertos, fallos y tamaño actual."""
+        with self.__lock:
+            return {
+                "aciertos": self.__aciertos,
+                "fallos": self.__fallos,
+                "elementos": len(self.__datos),
+                "max_elementos": self.max_elementos,
+            }
+
+
 class Empleados:
     """Clase para gestionar empleados con datos cifrados"""
 
+    # Filas leídas por buscar_por_id(s) (None para desactivarlo). Se guardan
+    # las tuplas y no las instancias, así cada llamada recibe un objeto
+    # propio y modificarlo no altera lo que ven los demás lectores. Los
+    # cambios hechos desde otro proceso se ven al vencer la entrada (ttl).
+    cache = CacheLRU(max_elementos=1000, ttl=300)
+
+    # Campo cifrado -> atributo con su caché de texto plano (blob, texto)
+    CAMPOS_CIFRADOS = {
+        '_direccion_cifrada': '_direccion_texto',
+        '_telefono_cifrado': '_telefono_texto',
+        '_email_cifrada': '_email_texto',
+    }
+
+    # Sin __dict__ por instancia: los listados crean un objeto por fila
+    __slots__ = ('db', 'id_empleado', 'nombre', 'fecha_contratacion', 'salario',
+                 *CAMPOS_CIFRADOS, *CAMPOS_CIFRADOS.values())
+
+    # Columnas leídas, en el orden que espera _desde_fila
+    COLUMNAS = ("id_empleado", "nombre", "direccion", "telefono", "email",
+                "fecha_contratacion", "salario")
+    SQL_SELECT = f"SELECT {', '.join(COLUMNAS)} FROM Empleados"
+
     def __init__(self, db, id_empleado=None, nombre="", direccion="",
                  telefono="", email="", fecha_contratacion=None, salario=0.0):
         self.db = db
@@ -52,6 +286,9 @@ class Empleados:
         self._direccion_cifrada = None
         self._telefono_cifrado = None
         self._email_cifrada = None
+        self._direccion_texto = None
+        self._telefono_texto = None
+        self._email_texto = None
 
         if direccion:
             self.direccion = direccion
@@ -72,35 +309,52 @@ class Empleados:
 
     # ==================== Propiedades ======================
 
+    def _descifrar(self, atributo):
+        """Descifra un campo en el primer acceso y reutiliza el resultado.
+
+        La caché guarda el blob del que proviene el texto, así que asignar
+        directamente el atributo cifrado también la invalida.
+        """
+        blob = getattr(self, atributo)
+        atributo_texto = self.CAMPOS_CIFRADOS[atributo]
+        cache = getattr(self, atributo_texto)
+        if cache is None or cache[0] is not blob:
+            cache = (blob, _aes_decrypt_ecb(blob))
+            setattr(self, atributo_texto, cache)
+        return cache[1]
+
     @property
     def direccion(self) -> str:
         """Devuelve la dirección descifrada."""
-        return _aes_decrypt_ecb(self._direccion_cifrada)
+        return self._descifrar('_direccion_cifrada')
 
     @direccion.setter
     def direccion(self, valor: str):
         """Cifra y almacena la dirección."""
         self._direccion_cifrada = _aes_encrypt_ecb(valor)
+        self._direccion_texto = None
 
     @property
     def telefono(self) -> str:
         """Devuelve el teléfono descifrado."""
-        return _aes_decrypt_ecb(self._telefono_cifrado)
+        return self._descifrar('_telefono_cifrado')
 
     @telefono.setter
     def telefono(self, valor: str):
         """Cifra y almacena el teléfono."""
         self._telefono_cifrado = _aes_encrypt_ecb(str(valor))
+        self._telefono_texto = None
 
     @property
     def email(self) -> str:
         """Devuelve el email descifrado."""
-        return _aes_decrypt_ecb(self._email_cifrada)
+        return self._descifrar('_email_cifrada')
 
     @email.setter
     def email(self, valor: str):
         """Cifra y almacena el email."""
         self._email_cifrada = _aes_encrypt_ecb(valor)
+        self._email_texto = None
 
     # ======================= CRUD =========================
 
@@ -121,20 +375,16 @@ class Empleados:
         )
 
         try:
-            connection = self.db.conectar()
-            cursor = connection.cursor()
-            cursor.execute(sql, values)
-            connection.commit()
-            self.id_empleado = cursor.lastrowid
-            print(
-                f"Empleado '{self.nombre}' registrado con ID: {self.id_empleado}")
-            return self.id_empleado
+            with self.db.conexion() as connection:
+                cursor = self.db.preparada(connection, sql, values)
+                connection.commit()
+                self.id_empleado = cursor.lastrowid
+                print(
+                    f"Empleado '{self.nombre}' registrado con ID: {self.id_empleado}")
+                return self.id_empleado
         except Error as e:
-            connection.rollback()
             print(f"Error al registrar empleado: {e}")
             return None
-        finally:
-            cursor.close()
 
     def actualizar_empleado(self):
         """Actualizar datos del empleado."""
@@ -153,89 +403,435 @@ class Empleados:
         )
 
         try:
-            connection = self.db.conectar()
-            cursor = connection.cursor()
-            cursor.execute(sql, values)
-            connection.commit()
-            print(
-                f"Empleado ID {self.id_empleado} actualizado correctamente")
-            return True
+            with self.db.conexion() as connection:
+                self.db.preparada(connection, sql, values)
+                connection.commit()
+                print(
+                    f"Empleado ID {self.id_empleado} actualizado correctamente")
+                return True
         except Error as e:
-            connection.rollback()
             print(f"Error al actualizar empleado: {e}")
             return False
         finally:
-            cursor.close()
+            if Empleados.cache is not None:
+                Empleados.cache.invalidar(self.id_empleado)
+
+    # Máximo de filas rechazadas que se detallan en el reporte de carga
+    MAX_DETALLE_RECHAZOS = 100
+
+    @staticmethod
+    def _validar_fila(fila):
+        """Valida una fila (dict) y la convierte en una tupla sin cifrar."""
+        if not isinstance(fila, dict):
+            raise ValueError("formato de fila inválido")
+        try:
+            textos = [fila[c] for c in ('nombre', 'direccion', 'telefono', 'email')]
+            salario = fila['salario']
+        except KeyError as e:
+            raise ValueError(f"falta la columna {e}")
+        for columna, valor in zip(('nombre', 'direccion', 'telefono', 'email', 'salario'),
+                                  textos + [salario]):
+            if valor is None or not str(valor).strip():
+                raise ValueError(f"falta el valor de {columna}")
+        try:
+            salario = float(salario)
+            fecha = fila.get('fecha_contratacion') or date.today()
+            if isinstance(fecha, str):
+                fecha = date.fromisoformat(fecha.strip())
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"valor inválido ({e})")
+
+        if not isinstance(fecha, date):
+            raise ValueError(f"fecha_contratacion inválida ({fecha!r})")
+        if salario < 0:
+            raise ValueError(f"salario no puede ser negativo ({salario})")
+        nombre, direccion, telefono, email = (str(t).strip() for t in textos)
+        return (nombre, direccion, telefono, email, fecha, salario)
+
+    @staticmethod
+    def _valores_lote(lote):
+        """Cifra los campos sensibles de un lote de filas ya validadas."""
+        direcciones = _aes_encrypt_lote([f[1] for f in lote])
+        telefonos = _aes_encrypt_lote([f[2] for f in lote])
+        emails = _aes_encrypt_lote([f[3] for f in lote])
+        return [(f[0], direccion, telefono, email, f[4], f[5])
+                for f, direccion, telefono, email
+                in zip(lote, direcciones, telefonos, emails)]
+
+    @staticmethod
+    def registrar_lote(db, filas, tamano_lote=1000):
+        """Inserta empleados de forma masiva, un commit por lote.
+
+        `filas` es un iterable de dicts con las claves nombre, direccion,
+        telefono, email, salario y opcionalmente fecha_contratacion; puede
+        ser un generador. Las filas inválidas se rechazan sin detener la
+        carga. Si la carga falla, el reporte lleva el mensaje en "error".
+        """
+        sql = """
+            INSERT INTO Empleados (nombre, direccion, telefono, email,
+                                   fecha_contratacion, salario)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """
+        reporte = {"insertados": 0, "rechazados": 0, "detalle_rechazos": [],
+                   "error": None}
+        inicio = time.perf_counter()
+
+        try:
+            with db.conexion() as connection, \
+                    closing(connection.cursor()) as cursor:
+                lote = []
+                for numero, fila in enumerate(filas, start=1):
+                    try:
+                        lote.append(Empleados._validar_fila(fila))
+                    except ValueError as e:
+                        reporte["rechazados"] += 1
+                        if len(reporte["detalle_rechazos"]) < Empleados.MAX_DETALLE_RECHAZOS:
+                            reporte["detalle_rechazos"].append((numero, str(e)))
+                        continue
+
+                    if len(lote) >= tamano_lote:
+                        valores = Empleados._valores_lote(lote)
+                        connection.start_transaction()
+                        cursor.executemany(sql, valores)
+                        connection.commit()
+                        reporte["insertados"] += len(lote)
+                        lote = []
+
+                if lote:
+                    valores = Empleados._valores_lote(lote)
+                    connection.start_transaction()
+                    cursor.executemany(sql, valores)
+                    connection.commit()
+                    reporte["insertados"] += len(lote)
+        except Error as e:
+            print(f"Error al registrar lote de empleados: {e}")
+            reporte["error"] = str(e)
+
+        segundos = time.perf_counter() - inicio
+        procesadas = reporte["insertados"] + reporte["rechazados"]
+        reporte["segundos"] = segundos
+        reporte["filas_por_segundo"] = procesadas / segundos if segundos > 0 else 0.0
+        print(f"{reporte['insertados']} empleados registrados, "
+              f"{reporte['rechazados']} rechazados en {segundos:.2f} s "
+              f"({reporte['filas_por_segundo']:,.0f} filas/s)")
+        return reporte
+
+    @staticmethod
+    def importar_csv(db, ruta, tamano_lote=1000, delimitador=","):
+        """Importa empleados desde un CSV con encabezados sin cargarlo entero."""
+        try:
+            with open(ruta, newline="", encoding="utf-8") as archivo:
+                lector = csv.DictReader(archivo, delimiter=delimitador)
+                return Empleados.registrar_lote(db, lector, tamano_lote)
+        except (OSError, UnicodeDecodeError, csv.Error) as e:
+            print(f"Error al leer archivo CSV: {e}")
+            return None
+
+    @staticmethod
+    def descifrar_lote(empleados):
+        """Descifra los datos sensibles de varios empleados de una sola vez.
+
+        Rellena la caché de cada instancia columna por columna con
+        _aes_decrypt_lote, útil antes de mostrar o exportar un listado.
+        """
+        for atributo, atributo_texto in Empleados.CAMPOS_CIFRADOS.items():
+            blobs = [getattr(emp, atributo) for emp in empleados]
+            for emp, blob, texto in zip(empleados, blobs, _aes_decrypt_lote(blobs)):
+                setattr(emp, atributo_texto, (blob, texto))
+        return empleados
+
+    @staticmethod
+    def _desde_fila(db, row):
+        """Construye un empleado a partir de una tupla en el orden de COLUMNAS.
+
+        No pasa por __init__: los valores de la fila se asignan directo a
+        los slots, sin argumentos por defecto ni cifrado. El protocolo
+        binario puro entrega como str los BLOB que son UTF-8 válido, así
+        que esas columnas se devuelven a bytes.
+        """
+        emp = Empleados.__new__(Empleados)
+        emp.db = db
+        (emp.id_empleado, emp.nombre, direccion, telefono,
+         email, emp.fecha_contratacion, emp.salario) = row
+        emp._direccion_cifrada = _a_bytes(direccion)
+        emp._telefono_cifrado = _a_bytes(telefono)
+        emp._email_cifrada = _a_bytes(email)
+        emp._direccion_texto = emp._telefono_texto = emp._email_texto = None
+        return emp
+
+    @staticmethod
+    def iterar_empleados(db, tamano_pagina=500):
+        """Genera los empleados página a página, paginando por id_empleado.
+
+        Cada página se lee con su propia conexión del pool, de modo que no
+        se retiene una conexión mientras el llamador procesa las filas.
+        """
+        sql = f"""
+            {Empleados.SQL_SELECT}
+            WHERE id_empleado > %s
+            ORDER BY id_empleado
+            LIMIT %s
+        """
+        ultimo_id = 0
+        while True:
+            try:
+                with db.conexion() as connection, \
+                        closing(connection.cursor()) as cursor:
+                    cursor.execute(sql, (ultimo_id, tamano_pagina))
+                    pagina = cursor.fetchall()
+            except Error as e:
+                print(f"Error al listar empleados: {e}")
+                return
+
+            yield from Empleados.descifrar_lote(
+                [Empleados._desde_fila(db, row) for row in pagina])
+
+            if len(pagina) < tamano_pagina:
+                return
+            ultimo_id = pagina[-1][0]
 
     @staticmethod
     def listar_empleados(db):
         """Lista todos los empleados."""
         try:
-            connection = db.conectar()
-            cursor = connection.cursor(dictionary=True)
-            cursor.execute("SELECT * FROM Empleados")
-            resultados = cursor.fetchall()
-
-            empleados = []
-            for row in resultados:
-                emp = Empleados(
-                    db, id_empleado=row['id_empleado'], nombre=row['nombre'])
-                emp._direccion_cifrada = row['direccion']
-                emp._telefono_cifrado = row['telefono']
-                emp._email_cifrada = row['email']
-                emp.fecha_contratacion = row['fecha_contratacion']
-                emp.salario = row['salario']
-                empleados.append(emp)
-
-            return empleados
+            with db.conexion() as connection, \
+                    closing(connection.cursor()) as cursor:
+                cursor.execute(Empleados.SQL_SELECT)
+                resultados = cursor.fetchall()
+
+                return Empleados.descifrar_lote(
+                    [Empleados._desde_fila(db, row) for row in resultados])
         except Error as e:
             print(f"Error al listar empleados: {e}")
             return []
-        finally:
-            cursor.close()
 
     @staticmethod
     def buscar_por_id(db, id_empleado):
         """Buscar empleado por ID."""
         try:
-            connection = db.conectar()
-            cursor = connection.cursor(dictionary=True)
-            cursor.execute(
-                "SELECT * FROM Empleados WHERE id_empleado = %s", (id_empleado,))
-            row = cursor.fetchone()
-
-            if row:
-                emp = Empleados(
-                    db, id_empleado=row['id_empleado'], nombre=row['nombre'])
-                emp._direccion_cifrada = row['direccion']
-                emp._telefono_cifrado = row['telefono']
-                emp._email_cifrada = row['email']
-                emp.fecha_contratacion = row['fecha_contratacion']
-                emp.salario = row['salario']
-                return emp
-            return None
+            row = _filas_con_cache(db, Empleados.cache, Empleados.SQL_SELECT,
+                                   "id_empleado", [id_empleado]).get(id_empleado)
         except Error as e:
             print(f"Error al buscar empleado: {e}")
             return None
-        finally:
-            cursor.close()
+        return Empleados._desde_fila(db, row) if row else None
+
+    @staticmethod
+    def buscar_por_ids(db, ids):
+        """Buscar varios empleados en una consulta; devuelve {id: empleado}."""
+        try:
+            filas = _filas_con_cache(db, Empleados.cache, Empleados.SQL_SELECT,
+                                     "id_empleado", ids)
+        except Error as e:
+            print(f"Error al buscar empleados: {e}")
+            return {}
+        return {id_empleado: Empleados._desde_fila(db, row)
+                for id_empleado, row in filas.items()}
 
     @staticmethod
     def eliminar_empleado(db, id_empleado):
         """Eliminar empleado."""
         try:
-            connection = db.conectar()
-            cursor = connection.cursor()
-            cursor.execute(
-                "DELETE FROM Empleados WHERE id_empleado = %s", (id_empleado,))
-            connection.commit()
-            print(f"Empleado ID {id_empleado} eliminado")
-            return True
+            with db.conexion() as connection:
+                db.preparada(
+                    connection,
+                    "DELETE FROM Empleados WHERE id_empleado = %s", (id_empleado,))
+                connection.commit()
+                print(f"Empleado ID {id_empleado} eliminado")
+                return True
         except Error as e:
             print(f"Error al eliminar empleado: {e}")
             return False
         finally:
-            cursor.close()
+            if Empleados.cache is not None:
+                Empleados.cache.invalidar(id_empleado)
+            # El borrado se propaga en cascada a departamentos y usuarios
+            if Departamento.cache is not None:
+                Departamento.cache.limpiar()
+            Usuario.roles.limpiar()
+
+
+class SobrecargaAutenticacion(Exception):
+    """La cola de verificación bcrypt está llena; se rechaza el intento."""
+
+
+class VerificadorBcrypt:
+    """Pool acotado de hilos para verificar contraseñas bcrypt.
+
+    bcrypt libera el GIL mientras calcula el hash, así que un hilo por
+    núcleo aprovecha toda la CPU. Si hay más de `max_pendientes`
+    verificaciones en curso o en cola, las nuevas se rechazan de inmediato
+    con SobrecargaAutenticacion en lugar de acumular espera.
+    """
+
+    def __init__(self, hilos=None, max_pendientes=None):
+        self.hilos = hilos or os.cpu_count() or 1
+        self.max_pendientes = max_pendientes or self.hilos * 4
+        self.__executor = ThreadPoolExecutor(
+            max_workers=self.hilos, thread_name_prefix="bcrypt")
+        self.__lock = threading.Lock()
+        self.__pendientes = 0
+        self.__stats = {"verificaciones": 0, "hashes": 0,
+                        "rechazadas": 0, "max_cola": 0}
+
+    def _terminada(self, _futuro):
+        """Descuenta una verificación de la cola al terminar."""
+        with self.__lock:
+            self.__pendientes -= 1
+
+    def _ejecutar(self, tipo, funcion, *args, timeout=None):
+        """Encola un cálculo bcrypt respetando el límite de pendientes."""
+        with self.__lock:
+            if self.__pendientes >= self.max_pendientes:
+                self.__stats["rechazadas"] += 1
+                raise SobrecargaAutenticacion(
+                    f"{self.__pendientes} verificaciones pendientes")
+            self.__pendientes += 1
+            self.__stats[tipo] += 1
+            self.__stats["max_cola"] = max(
+                self.__stats["max_cola"], self.__pendientes)
+
+        futuro = self.__executor.submit(funcion, *args)
+        futuro.add_done_callback(self._terminada)
+        return futuro.result(timeout)
+
+    def verificar(self, password, password_hash, timeout=None):
+        """Verifica una contraseña contra su hash en el pool."""
+        return self._ejecutar(
+            "verificaciones", bcrypt.checkpw,
+            password.encode('utf-8'), password_hash.encode('utf-8'),
+            timeout=timeout)
+
+    def hashear(self, password, rounds, timeout=None):
+        """Genera un hash bcrypt nuevo en el pool."""
+        return self._ejecutar(
+            "hashes", Usuario._hash_password, password, rounds,
+            timeout=timeout)
+
+    def profundidad_cola(self):
+        """Verificaciones en curso o esperando un hilo."""
+        with self.__lock:
+            return self.__pendientes
+
+    def estadisticas(self):
+        """Resumen del uso del pool de verificación."""
+        with self.__lock:
+            stats = dict(self.__stats)
+            stats.update({
+                "hilos": self.hilos,
+                "max_pendientes": self.max_pendientes,
+                "pendientes": self.__pendientes,
+            })
+            return stats
+
+
+class SesionesUsuario:
+    """Sesiones autenticadas con vencimiento, en memoria o respaldadas en archivo.
+
+    Solo se guarda el SHA-256 de cada token, de modo que el archivo de
+    sesiones no permite suplantar a nadie si se filtra. Varios procesos
+    pueden compartir el archivo: cada escritura mezcla lo que hay en disco.
+    """
+
+    def __init__(self, ttl=8 * 3600, ruta=None):
+        self.ttl = ttl
+        self.ruta = ruta
+        self.__lock = threading.Lock()
+        # Huellas cerradas aquí y aún no escritas, para no revivirlas al mezclar
+        self.__cerradas = set()
+        self.__sesiones = self._cargar()
+
+    @staticmethod
+    def _huella(token):
+        """Huella del token usada como clave de la sesión."""
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    def _cargar(self):
+        """Lee las sesiones vigentes del archivo, si hay uno configurado."""
+        if not self.ruta:
+            return {}
+        try:
+            with open(self.ruta, encoding="utf-8") as archivo:
+                sesiones = json.load(archivo)
+        except (OSError, ValueError):
+            return {}
+        return self._vigentes(sesiones)
+
+    @staticmethod
+    def _vigentes(sesiones):
+        """Filtra las sesiones que no han vencido."""
+        ahora = time.time()
+        return {h: s for h, s in sesiones.items() if s["vence"] > ahora}
+
+    def _persistir(self):
+        """Poda las sesiones vencidas y las escribe a disco de forma atómica.
+
+        Antes de escribir se mezclan las del archivo para no borrar las que
+        abrió otro proceso. Dos escrituras exactamente simultáneas todavía
+        pueden perder una sesión nueva, que deberá iniciarse de nuevo.
+        """
+        self.__sesiones = self._vigentes(self.__sesiones)
+        if not self.ruta:
+            return
+        sesiones = self._cargar()
+        for huella in self.__cerradas:
+            sesiones.pop(huella, None)
+        sesiones.update(self.__sesiones)
+        temporal = f"{self.ruta}.{os.getpid()}.tmp"
+        try:
+            with open(temporal, "w", encoding="utf-8") as archivo:
+                json.dump(sesiones, archivo)
+            os.replace(temporal, self.ruta)
+        except OSError as e:
+            print(f"No se pudo guardar el archivo de sesiones: {e}")
+            return
+        self.__sesiones = sesiones
+        self.__cerradas.clear()
+
+    def crear(self, usuario):
+        """Abre una sesión para un usuario autenticado y devuelve su token."""
+        token = secrets.token_urlsafe(32)
+        with self.__lock:
+            self.__sesiones[self._huella(token)] = {
+                "id_usuario": usuario.id_usuario,
+                "nombre_usuario": usuario.nombre_usuario,
+                "rol": usuario.rol,
+                "id_empleado": usuario.id_empleado,
+                "vence": time.time() + self.ttl,
+            }
+            self._persistir()
+        return token
+
+    def validar(self, token):
+        """Devuelve los datos de la sesión, o None si no existe o venció."""
+        if not token:
+            return None
+        huella = self._huella(token)
+        with self.__lock:
+            sesion = self.__sesiones.get(huella)
+            if sesion is None and self.ruta and huella not in self.__cerradas:
+                # Puede haberla abierto otro proceso que comparte el archivo
+                sesion = self._cargar().get(huella)
+                if sesion is not None:
+                    self.__sesiones[huella] = sesion
+            if sesion is None:
+                return None
+            if sesion["vence"] <= time.time():
+                del self.__sesiones[huella]
+                self.__cerradas.add(huella)
+                self._persistir()
+                return None
+            return dict(sesion)
+
+    def cerrar(self, token):
+        """Cierra una sesión."""
+        with self.__lock:
+            huella = self._huella(token)
+            abierta = self.__sesiones.pop(huella, None) is not None
+            # Con archivo puede ser una sesión abierta por otro proceso
+            if abierta or self.ruta:
+                self.__cerradas.add(huella)
+                self._persistir()
 
 
 class Usuario:
@@ -243,6 +839,19 @@ class Usuario:
     Clase para gestionar usuarios del sistema con autenticación bcrypt.
     """
 
+    # Costo bcrypt para hashes nuevos (2^n iteraciones). Los hashes con otro
+    # costo se recalculan en el siguiente inicio de sesión exitoso.
+    COSTO_BCRYPT = _entero_de_entorno("ECOTECH_BCRYPT_ROUNDS", 12, minimo=4, maximo=31)
+
+    # Pool compartido por todas las autenticaciones del proceso
+    verificador = VerificadorBcrypt()
+
+    # Sesiones abiertas en este proceso
+    sesiones = SesionesUsuario()
+
+    # Rol vigente por id_usuario, para autorizar sin consultar la BD
+    roles = CacheLRU(max_elementos=10000, ttl=300)
+
     def __init__(self, db, id_usuario=None, nombre_usuario="", password="",
                  rol="", id_empleado=None):
         self.db = db
@@ -252,57 +861,184 @@ class Usuario:
         self.__password_hash = None
         self.rol = rol
         self.id_empleado = id_empleado
+        self.token = None
 
     def __str__(self):
         return f"ID: {self.id_usuario}, Usuario: {self.nombre_usuario}, Rol: {self.rol}"
 
     @staticmethod
-    def _hash_password(password):
+    def _hash_password(password, rounds=None):
         """Genera hash bcrypt de la contraseña con sal automática."""
         # Genera sal y hashea
         # rounds=12 significa 2^12 = 4096
-        salt = bcrypt.gensalt(rounds=12)
+        salt = bcrypt.gensalt(rounds=rounds or Usuario.COSTO_BCRYPT)
         hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
         return hashed.decode('utf-8')  # Convertir a string para almacenar
 
+    @staticmethod
+    def _costo_hash(password_hash):
+        """Extrae el costo de un hash bcrypt ($2b$12$...)."""
+        try:
+            return int(password_hash.split('$')[2])
+        except (IndexError, ValueError):
+            return None
+
+    def _actualizar_costo(self, password_hash):
+        """Recalcula el hash con el costo configurado si es distinto."""
+        if self._costo_hash(password_hash) == self.COSTO_BCRYPT:
+            return
+        try:
+            nuevo_hash = self.verificador.hashear(
+                self.password, self.COSTO_BCRYPT)
+        except SobrecargaAutenticacion:
+            return  # Se reintentará en el próximo inicio de sesión
+        try:
+            with self.db.conexion() as connection:
+                self.db.preparada(
+                    connection,
+                    "UPDATE Usuario SET password_hash = %s WHERE id_usuario = %s",
+                    (nuevo_hash, self.id_usuario))
+                connection.commit()
+        except Error as e:
+            print(f"Error al actualizar el costo del hash: {e}")
+
     def autenticar(self):
         """Autentica usuario usando bcrypt"""
         try:
-            connection = self.db.conectar()
-            cursor = connection.cursor(dictionary=True)
-
-            # Buscar usuario
-            cursor.execute(
-                "SELECT * FROM Usuario WHERE nombre_usuario = %s",
-                (self.nombre_usuario,)
-            )
-            resultado = cursor.fetchone()
-
-            if resultado:
-                # Verificar contraseña con bcrypt
-                stored_hash = resultado['password_hash'].encode('utf-8')
-                if bcrypt.checkpw(self.password.encode('utf-8'), stored_hash):
-                    self.id_usuario = resultado['id_usuario']
-                    self.rol = resultado['rol']
-                    self.id_empleado = resultado['id_empleado']
-                    print(f"Bienvenido {self.nombre_usuario} ({self.rol})")
-                    return True
-                else:
-                    print("Usuario o contraseña incorrectos")
-                    return False
-            else:
-                print("Usuario o contraseña incorrectos")
-                return False
+            # La conexión se devuelve al pool antes de calcular el hash
+            with self.db.conexion() as connection:
+
+                # Buscar usuario
+                cursor = self.db.preparada(
+                    connection,
+                    "SELECT id_usuario, password_hash, rol, id_empleado "
+                    "FROM Usuario WHERE nombre_usuario = %s",
+                    (self.nombre_usuario,)
+                )
+                filas = cursor.fetchall()
+                resultado = filas[0] if filas else None
         except Error as e:
             print(f"Error en autenticación: {e}")
             return False
-        finally:
-            cursor.close()
+
+        if not resultado:
+            print("Usuario o contraseña incorrectos")
+            return False
+
+        id_usuario, password_hash, rol, id_empleado = resultado
+
+        # Verificar contraseña con bcrypt
+        try:
+            valida = self.verificador.verificar(self.password, password_hash)
+        except SobrecargaAutenticacion:
+            print("Sistema ocupado, intente nuevamente en unos segundos")
+            return False
+
+        if valida:
+            self.id_usuario = id_usuario
+            self.rol = rol
+            self.id_empleado = id_empleado
+            self.roles.guardar(self.id_usuario, self.rol)
+            self._actualizar_costo(password_hash)
+            print(f"Bienvenido {self.nombre_usuario} ({self.rol})")
+            return True
+        print("Usuario o contraseña incorrectos")
+        return False
+
+    def iniciar_sesion(self):
+        """Autentica una vez y abre una sesión; devuelve el token o None."""
+        if not self.autenticar():
+            return None
+        self.token = self.sesiones.crear(self)
+        return self.token
+
+    def cerrar_sesion(self):
+        """Cierra la sesión abierta por iniciar_sesion."""
+        if self.token:
+            self.sesiones.cerrar(self.token)
+            self.token = None
+
+    @classmethod
+    def desde_sesion(cls, db, token):
+        """Reconstruye el usuario de una sesión vigente sin consultar la BD."""
+        sesion = cls.sesiones.validar(token)
+        if sesion is None:
+            return None
+        usuario = cls(db, id_usuario=sesion['id_usuario'],
+                      nombre_usuario=sesion['nombre_usuario'],
+                      rol=sesion['rol'], id_empleado=sesion['id_empleado'])
+        usuario.token = token
+        return usuario
 
     def autorizar(self, rol_requerido):
-        """Verifica si el usuario tiene el rol necesario."""
+        """Verifica si el usuario tiene el rol necesario.
+
+        El rol vigente sale de la caché o, si no está, de la BD; nunca del
+        rol guardado en la instancia o la sesión, que puede estar obsoleto.
+        """
+        if self.id_usuario is not None:
+            rol = self.roles.obtener(self.id_usuario, _SIN_VALOR)
+            if rol is _SIN_VALOR:
+                rol = self.cargar_roles(self.db, [self.id_usuario]).get(self.id_usuario)
+            self.rol = rol
         return self.rol == rol_requerido or self.rol == "admin"
 
+    @classmethod
+    def autorizar_id(cls, db, id_usuario, rol_requerido):
+        """Verifica el rol de un usuario por ID usando la caché de roles."""
+        rol = cls.roles.obtener(id_usuario, _SIN_VALOR)
+        if rol is _SIN_VALOR:
+            rol = cls.cargar_roles(db, [id_usuario]).get(id_usuario)
+        return rol == rol_requerido or rol == "admin"
+
+    @classmethod
+    def cargar_roles(cls, db, ids):
+        """Carga en la caché los roles de varios usuarios con una sola consulta.
+
+        Devuelve {id_usuario: rol} para los IDs que existen. Los IDs que no
+        existen también se guardan (con rol None) para no volver a
+        consultarlos hasta que venza el TTL.
+        """
+        ids = list(set(ids))
+        if not ids:
+            return {}
+        marcadores = ", ".join(["%s"] * len(ids))
+        try:
+            with db.conexion() as connection, \
+                    closing(connection.cursor()) as cursor:
+                cursor.execute(
+                    f"SELECT id_usuario, rol FROM Usuario WHERE id_usuario IN ({marcadores})",
+                    tuple(ids))
+                roles = dict(cursor.fetchall())
+        except Error as e:
+            print(f"Error al cargar roles: {e}")
+            return {}
+        for id_usuario in ids:
+            cls.roles.guardar(id_usuario, roles.get(id_usuario))
+        return roles
+
+    def actualizar_usuario(self):
+        """Actualiza nombre, rol y empleado del usuario y su rol en caché."""
+        sql = """
+            UPDATE Usuario
+            SET nombre_usuario=%s, rol=%s, id_empleado=%s
+            WHERE id_usuario=%s
+        """
+        values = (self.nombre_usuario, self.rol,
+                  self.id_empleado, self.id_usuario)
+
+        try:
+            with self.db.conexion() as connection:
+                self.db.preparada(connection, sql, values)
+                connection.commit()
+                self.roles.guardar(self.id_usuario, self.rol)
+                print(f"Usuario ID {self.id_usuario} actualizado")
+                return True
+        except Error as e:
+            print(f"Error al actualizar usuario: {e}")
+            self.roles.invalidar(self.id_usuario)
+            return False
+
     def registrar_usuario(self):
         """Registra nuevo usuario con contraseña hasheada."""
         # Hashear contraseña antes de guardar
@@ -316,41 +1052,50 @@ class Usuario:
                   self.rol, self.id_empleado)
 
         try:
-            connection = self.db.conectar()
-            cursor = connection.cursor()
-            cursor.execute(sql, values)
-            connection.commit()
-            self.id_usuario = cursor.lastrowid
-            print(
-                f"Usuario '{self.nombre_usuario}' registrado con ID: {self.id_usuario}")
-            print("Contraseña hasheada")
-            return self.id_usuario
+            with self.db.conexion() as connection:
+                cursor = self.db.preparada(connection, sql, values)
+                connection.commit()
+                self.id_usuario = cursor.lastrowid
+                self.roles.guardar(self.id_usuario, self.rol)
+                print(
+                    f"Usuario '{self.nombre_usuario}' registrado con ID: {self.id_usuario}")
+                print("Contraseña hasheada")
+                return self.id_usuario
         except Error as e:
-            connection.rollback()
             print(f"Error al registrar usuario: {e}")
             return None
-        finally:
-            cursor.close()
 
     @staticmethod
     def listar_usuarios(db):
-        """Lista todos los usuarios (sin mostrar hashes)."""
+        """Lista todos los usuarios (sin mostrar hashes) como FilaUsuario."""
         try:
-            connection = db.conectar()
-            cursor = connection.cursor(dictionary=True)
-            cursor.execute(
-                "SELECT id_usuario, nombre_usuario, rol, id_empleado FROM Usuario")
-            return cursor.fetchall()
+            with db.conexion() as connection, \
+                    closing(connection.cursor()) as cursor:
+                cursor.execute(
+                    f"SELECT {', '.join(FilaUsuario._fields)} FROM Usuario")
+                return list(map(FilaUsuario._make, cursor.fetchall()))
         except Error as e:
             print(f"Error al listar usuarios: {e}")
             return []
-        finally:
-            cursor.close()
+
+
+# Fila de listar_usuarios: tupla con acceso por nombre, sin dict por fila
+FilaUsuario = namedtuple(
+    "FilaUsuario", ("id_usuario", "nombre_usuario", "rol", "id_empleado"))
 
 
 class Departamento:
     """Clase para gestionar departamentos."""
 
+    # Filas leídas por buscar_por_id(s), como en Empleados.cache
+    cache = CacheLRU(max_elementos=1000, ttl=300)
+
+    __slots__ = ('db', 'id_departamento', 'nombre', 'gerente',
+                 'id_empleado', 'id_proyecto')
+
+    COLUMNAS = ("id_departamento", "nombre", "gerente", "id_empleado", "id_proyecto")
+    SQL_SELECT = f"SELECT {', '.join(COLUMNAS)} FROM Departamentos"
+
     def __init__(self, db, id_departamento=None, nombre="", gerente="",
                  id_empleado=None, id_proyecto=None):
         self.db = db
@@ -363,6 +1108,15 @@ class Departamento:
     def __str__(self):
         return f"ID: {self.id_departamento}, Nombre: {self.nombre}, Gerente: {self.gerente}"
 
+    @staticmethod
+    def _desde_fila(db, row):
+        """Construye un departamento desde una tupla en el orden de COLUMNAS."""
+        dept = Departamento.__new__(Departamento)
+        dept.db = db
+        (dept.id_departamento, dept.nombre, dept.gerente,
+         dept.id_empleado, dept.id_proyecto) = row
+        return dept
+
     def crear_departamento(self):
         """Crear departamento en la BD."""
         sql = """
@@ -373,20 +1127,16 @@ class Departamento:
                   self.id_empleado, self.id_proyecto)
 
         try:
-            connection = self.db.conectar()
-            cursor = connection.cursor()
-            cursor.execute(sql, values)
-            connection.commit()
-            self.id_departamento = cursor.lastrowid
-            print(
-                f"Departamento '{self.nombre}' creado con ID: {self.id_departamento}")
-            return self.id_departamento
+            with self.db.conexion() as connection:
+                cursor = self.db.preparada(connection, sql, values)
+                connection.commit()
+                self.id_departamento = cursor.lastrowid
+                print(
+                    f"Departamento '{self.nombre}' creado con ID: {self.id_departamento}")
+                return self.id_departamento
         except Error as e:
-            connection.rollback()
             print(f"Error al crear departamento: {e}")
             return None
-        finally:
-            cursor.close()
 
     def actualizar_departamento(self):
         """Actualizar departamento."""
@@ -399,82 +1149,82 @@ class Departamento:
                   self.id_proyecto, self.id_departamento)
 
         try:
-            connection = self.db.conectar()
-            cursor = connection.cursor()
-            cursor.execute(sql, values)
-            connection.commit()
-            print(f"Departamento ID {self.id_departamento} actualizado")
-            return True
+            with self.db.conexion() as connection:
+                self.db.preparada(connection, sql, values)
+                connection.commit()
+                print(f"Departamento ID {self.id_departamento} actualizado")
+                return True
         except Error as e:
-            connection.rollback()
             print(f"Error al actualizar departamento: {e}")
             return False
         finally:
-            cursor.close()
+            if Departamento.cache is not None:
+                Departamento.cache.invalidar(self.id_departamento)
 
     @staticmethod
     def listar_departamentos(db):
         """Listar todos los departamentos."""
         try:
-            connection = db.conectar()
-            cursor = connection.cursor(dictionary=True)
-            cursor.execute("SELECT * FROM Departamentos")
-            return cursor.fetchall()
+            with db.conexion() as connection, \
+                    closing(connection.cursor()) as cursor:
+                cursor.execute(Departamento.SQL_SELECT)
+                return [Departamento._desde_fila(db, row) for row in cursor.fetchall()]
         except Error as e:
             print(f"Error al listar departamentos: {e}")
             return []
-        finally:
-            cursor.close()
 
     @staticmethod
     def buscar_por_id(db, id_departamento):
         """Buscar departamento por ID."""
         try:
-            connection = db.conectar()
-            cursor = connection.cursor(dictionary=True)
-            cursor.execute(
-                "SELECT * FROM Departamentos WHERE id_departamento = %s",
-                (id_departamento,))
-            row = cursor.fetchone()
-
-            if row:
-                return Departamento(
-                    db,
-                    id_departamento=row['id_departamento'],
-                    nombre=row['nombre'],
-                    gerente=row['gerente'],
-                    id_empleado=row['id_empleado'],
-                    id_proyecto=row['id_proyecto']
-                )
-            return None
+            row = _filas_con_cache(db, Departamento.cache, Departamento.SQL_SELECT,
+                                   "id_departamento", [id_departamento]).get(id_departamento)
         except Error as e:
             print(f"Error al buscar departamento: {e}")
             return None
-        finally:
-            cursor.close()
+        return Departamento._desde_fila(db, row) if row else None
+
+    @staticmethod
+    def buscar_por_ids(db, ids):
+        """Buscar varios departamentos en una consulta; devuelve {id: departamento}."""
+        try:
+            filas = _filas_con_cache(db, Departamento.cache, Departamento.SQL_SELECT,
+                                     "id_departamento", ids)
+        except Error as e:
+            print(f"Error al buscar departamentos: {e}")
+            return {}
+        return {id_departamento: Departamento._desde_fila(db, row)
+                for id_departamento, row in filas.items()}
 
     @staticmethod
     def eliminar_departamento(db, id_departamento):
         """Eliminar departamento."""
         try:
-            connection = db.conectar()
-            cursor = connection.cursor()
-            cursor.execute(
-                "DELETE FROM Departamentos WHERE id_departamento = %s",
-                (id_departamento,))
-            connection.commit()
-            print(f"Departamento ID {id_departamento} eliminado")
-            return True
+            with db.conexion() as connection:
+                db.preparada(
+                    connection,
+                    "DELETE FROM Departamentos WHERE id_departamento = %s",
+                    (id_departamento,))
+                connection.commit()
+                print(f"Departamento ID {id_departamento} eliminado")
+                return True
         except Error as e:
             print(f"Error al eliminar departamento: {e}")
             return False
         finally:
-            cursor.close()
+            if Departamento.cache is not None:
+                Departamento.cache.invalidar(id_departamento)
 
 
 class Proyecto:
     """Clase para gestionar proyectos."""
 
+    __slots__ = ('db', 'id_proyecto', 'nombre', 'descripcion',
+                 'fecha_inicio', 'fecha_termino')
+
+    COLUMNAS = ("id_proyecto", "nombre", "descripcion", "fecha_inicio", "fecha_termino")
+    SQL_SELECT = f"SELECT {', '.join(COLUMNAS)} FROM Proyectos"
+
     def __init__(self, db, id_proyecto=None, nombre="", descripcion="",
                  fecha_inicio=None, fecha_termino=None):
         self.db = db
@@ -488,6 +1238,15 @@ class Proyecto:
         return (f"ID: {self.id_proyecto}, Nombre: {self.nombre}, "
                 f"Inicio: {self.fecha_inicio}, Término: {self.fecha_termino}")
 
+    @staticmethod
+    def _desde_fila(db, row):
+        """Construye un proyecto desde una tupla en el orden de COLUMNAS."""
+        proy = Proyecto.__new__(Proyecto)
+        proy.db = db
+        (proy.id_proyecto, proy.nombre, proy.descripcion,
+         proy.fecha_inicio, proy.fecha_termino) = row
+        return proy
+
     def crear_proyecto(self):
         """Crear proyecto en la BD."""
         sql = """
@@ -498,20 +1257,16 @@ class Proyecto:
                   self.fecha_inicio, self.fecha_termino)
 
         try:
-            connection = self.db.conectar()
-            cursor = connection.cursor()
-            cursor.execute(sql, values)
-            connection.commit()
-            self.id_proyecto = cursor.lastrowid
-            print(
-                f"Proyecto '{self.nombre}' creado con ID: {self.id_proyecto}")
-            return self.id_proyecto
+            with self.db.conexion() as connection:
+                cursor = self.db.preparada(connection, sql, values)
+                connection.commit()
+                self.id_proyecto = cursor.lastrowid
+                print(
+                    f"Proyecto '{self.nombre}' creado con ID: {self.id_proyecto}")
+                return self.id_proyecto
         except Error as e:
-            connection.rollback()
             print(f"Error al crear proyecto: {e}")
             return None
-        finally:
-            cursor.close()
 
     def editar_proyecto(self):
         """Actualizar proyecto."""
@@ -524,54 +1279,69 @@ class Proyecto:
                   self.fecha_termino, self.id_proyecto)
 
         try:
-            connection = self.db.conectar()
-            cursor = connection.cursor()
-            cursor.execute(sql, values)
-            connection.commit()
-            print(f"Proyecto ID {self.id_proyecto} actualizado")
-            return True
+            with self.db.conexion() as connection:
+                self.db.preparada(connection, sql, values)
+                connection.commit()
+                print(f"Proyecto ID {self.id_proyecto} actualizado")
+                return True
         except Error as e:
-            connection.rollback()
             print(f"Error al actualizar proyecto: {e}")
             return False
-        finally:
-            cursor.close()
 
     @staticmethod
     def listar_proyectos(db):
         """Listar todos los proyectos."""
         try:
-            connection = db.conectar()
-            cursor = connection.cursor(dictionary=True)
-            cursor.execute("SELECT * FROM Proyectos")
-            return cursor.fetchall()
+            with db.conexion() as connection, \
+                    closing(connection.cursor()) as cursor:
+                cursor.execute(Proyecto.SQL_SELECT)
+                return [Proyecto._desde_fila(db, row) for row in cursor.fetchall()]
         except Error as e:
             print(f"Error al listar proyectos: {e}")
             return []
-        finally:
-            cursor.close()
+
+    @staticmethod
+    def buscar_por_ids(db, ids):
+        """Buscar varios proyectos en una consulta; devuelve {id: proyecto}."""
+        try:
+            return {
+                row[0]: Proyecto._desde_fila(db, row)
+                for row in _filas_por_ids(db, Proyecto.SQL_SELECT, "id_proyecto", ids)
+            }
+        except Error as e:
+            print(f"Error al buscar proyectos: {e}")
+            return {}
 
     @staticmethod
     def eliminar_proyecto(db, id_proyecto):
         """Eliminar proyecto."""
         try:
-            connection = db.conectar()
-            cursor = connection.cursor()
-            cursor.execute(
-                "DELETE FROM Proyectos WHERE id_proyecto = %s", (id_proyecto,))
-            connection.commit()
-            print(f"Proyecto ID {id_proyecto} eliminado")
-            return True
+            with db.conexion() as connection:
+                db.preparada(
+                    connection,
+                    "DELETE FROM Proyectos WHERE id_proyecto = %s", (id_proyecto,))
+                connection.commit()
+                print(f"Proyecto ID {id_proyecto} eliminado")
+                return True
         except Error as e:
             print(f"Error al eliminar proyecto: {e}")
             return False
         finally:
-            cursor.close()
+            # El borrado se propaga en cascada a los departamentos del proyecto
+            if Departamento.cache is not None:
+                Departamento.cache.limpiar()
 
 
 class RegistroDeTiempo:
     """Clase para gestionar registros de tiempo."""
 
+    __slots__ = ('db', 'id_registro', 'fecha', 'horas', 'descripcion',
+                 'id_empleado', 'id_proyecto')
+
+    COLUMNAS = ("id_registro", "fecha", "horas", "descripcion",
+                "id_empleado", "id_proyecto")
+    SQL_SELECT = f"SELECT {', '.join(COLUMNAS)} FROM RegistrodeTiempo"
+
     def __init__(self, db, id_registro=None, fecha=None, horas=0,
                  descripcion="", id_empleado=None, id_proyecto=None):
         self.db = db
@@ -586,6 +1356,15 @@ class RegistroDeTiempo:
         return (f"ID: {self.id_registro}, Fecha: {self.fecha}, Horas: {self.horas}, "
                 f"Empleado: {self.id_empleado}, Proyecto: {self.id_proyecto}")
 
+    @staticmethod
+    def _desde_fila(db, row):
+        """Construye un registro desde una tupla en el orden de COLUMNAS."""
+        reg = RegistroDeTiempo.__new__(RegistroDeTiempo)
+        reg.db = db
+        (reg.id_registro, reg.fecha, reg.horas, reg.descripcion,
+         reg.id_empleado, reg.id_proyecto) = row
+        return reg
+
     def registrar_tiempo(self):
         """Registrar tiempo trabajado."""
         sql = """
@@ -596,55 +1375,325 @@ class RegistroDeTiempo:
                   self.id_empleado, self.id_proyecto)
 
         try:
-            connection = self.db.conectar()
-            cursor = connection.cursor()
-            cursor.execute(sql, values)
-            connection.commit()
-            self.id_registro = cursor.lastrowid
-            print(f"Registro de tiempo creado con ID: {self.id_registro}")
-            return self.id_registro
+            with self.db.conexion() as connection:
+                cursor = self.db.preparada(connection, sql, values)
+                connection.commit()
+                self.id_registro = cursor.lastrowid
+                print(f"Registro de tiempo creado con ID: {self.id_registro}")
+                return self.id_registro
         except Error as e:
-            connection.rollback()
             print(f"Error al registrar tiempo: {e}")
             return None
-        finally:
-            cursor.close()
+
+    # ================== Carga masiva ======================
+
+    # Cantidad máxima de motivos de rechazo que se conservan en el reporte
+    MAX_DETALLE_RECHAZOS = 100
+
+    @staticmethod
+    def _ids_existentes(db):
+        """Carga una vez los IDs de empleados y proyectos para validar filas."""
+        with db.conexion() as connection, \
+                closing(connection.cursor()) as cursor:
+            cursor.execute("SELECT id_empleado FROM Empleados")
+            empleados = {row[0] for row in cursor.fetchall()}
+            cursor.execute("SELECT id_proyecto FROM Proyectos")
+            proyectos = {row[0] for row in cursor.fetchall()}
+        return empleados, proyectos
+
+    @staticmethod
+    def _validar_fila(fila, empleados, proyectos):
+        """Valida una fila y la convierte en la tupla a insertar."""
+        if not isinstance(fila, dict):
+            raise ValueError("formato de fila inválido")
+        try:
+            fecha = fila['fecha']
+            if isinstance(fecha, str):
+                fecha = date.fromisoformat(fecha.strip())
+            horas = int(fila['horas'])
+            id_empleado = int(fila['id_empleado'])
+            id_proyecto = int(fila['id_proyecto'])
+        except KeyError as e:
+            raise ValueError(f"falta la columna {e}")
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"valor inválido ({e})")
+
+        if not isinstance(fecha, date):
+            raise ValueError(f"fecha inválida ({fecha!r})")
+        if horas <= 0:
+            raise ValueError(f"horas debe ser positivo ({horas})")
+        if id_empleado not in empleados:
+            raise ValueError(f"empleado {id_empleado} no existe")
+        if id_proyecto not in proyectos:
+            raise ValueError(f"proyecto {id_proyecto} no existe")
+        return (fecha, horas, fila.get('descripcion') or "",
+                id_empleado, id_proyecto)
+
+    @staticmethod
+    def registrar_lote(db, filas, tamano_lote=1000):
+        """Registra tiempos de forma masiva validando antes las claves foráneas.
+
+        `filas` es un iterable de dicts con fecha, horas, id_empleado,
+        id_proyecto y opcionalmente descripcion. Las filas inválidas se
+        rechazan sin detener la carga; las válidas se insertan con
+        executemany y un commit por lote. Si la carga falla, el reporte
+        lleva el mensaje en "error".
+        """
+        sql = """
+            INSERT INTO RegistrodeTiempo (fecha, horas, descripcion, id_empleado, id_proyecto)
+            VALUES (%s, %s, %s, %s, %s)
+        """
+        reporte = {"aceptados": 0, "rechazados": 0, "detalle_rechazos": [],
+                   "error": None}
+        inicio = time.perf_counter()
+
+        try:
+            empleados, proyectos = RegistroDeTiempo._ids_existentes(db)
+            with db.conexion() as connection, \
+                    closing(connection.cursor()) as cursor:
+                lote = []
+                for numero, fila in enumerate(filas, start=1):
+                    try:
+                        lote.append(RegistroDeTiempo._validar_fila(
+                            fila, empleados, proyectos))
+                    except ValueError as e:
+                        reporte["rechazados"] += 1
+                        if len(reporte["detalle_rechazos"]) < RegistroDeTiempo.MAX_DETALLE_RECHAZOS:
+                            reporte["detalle_rechazos"].append((numero, str(e)))
+                        continue
+
+                    if len(lote) >= tamano_lote:
+                        connection.start_transaction()
+                        cursor.executemany(sql, lote)
+                        connection.commit()
+                        reporte["aceptados"] += len(lote)
+                        lote = []
+
+                if lote:
+                    connection.start_transaction()
+                    cursor.executemany(sql, lote)
+                    connection.commit()
+                    reporte["aceptados"] += len(lote)
+        except Error as e:
+            print(f"Error al registrar lote de tiempos: {e}")
+            reporte["error"] = str(e)
+
+        segundos = time.perf_counter() - inicio
+        procesadas = reporte["aceptados"] + reporte["rechazados"]
+        reporte["segundos"] = segundos
+        reporte["filas_por_segundo"] = procesadas / segundos if segundos > 0 else 0.0
+        print(f"{reporte['aceptados']} registros aceptados, "
+              f"{reporte['rechazados']} rechazados en {segundos:.2f} s "
+              f"({reporte['filas_por_segundo']:,.0f} filas/s)")
+        return reporte
+
+    @staticmethod
+    def _leer_jsonl(archivo):
+        """Genera un dict por línea; las líneas inválidas se entregan tal cual."""
+        for linea in archivo:
+            if not linea.strip():
+                continue
+            try:
+                yield json.loads(linea)
+            except ValueError:
+                yield linea
+
+    @staticmethod
+    def importar_archivo(db, ruta, tamano_lote=1000):
+        """Importa registros de tiempo desde un archivo CSV o JSONL."""
+        try:
+            with open(ruta, newline="", encoding="utf-8") as archivo:
+                if ruta.lower().endswith((".jsonl", ".ndjson")):
+                    filas = RegistroDeTiempo._leer_jsonl(archivo)
+                else:
+                    filas = csv.DictReader(archivo)
+                return RegistroDeTiempo.registrar_lote(db, filas, tamano_lote)
+        except OSError as e:
+            print(f"Error al leer archivo: {e}")
+            return None
 
     @staticmethod
     def listar_registros(db):
         """Listar todos los registros de tiempo."""
         try:
-            connection = db.conectar()
-            cursor = connection.cursor(dictionary=True)
-            cursor.execute("SELECT * FROM RegistrodeTiempo")
-            return cursor.fetchall()
+            with db.conexion() as connection, \
+                    closing(connection.cursor()) as cursor:
+                cursor.execute(RegistroDeTiempo.SQL_SELECT)
+                return [RegistroDeTiempo._desde_fila(db, row) for row in cursor.fetchall()]
         except Error as e:
             print(f"Error al listar registros: {e}")
             return []
-        finally:
-            cursor.close()
 
     @staticmethod
     def consultar_registro(db, id_empleado=None, id_proyecto=None):
         """Consultar registros por empleado o proyecto."""
         try:
-            connection = db.conectar()
-            cursor = connection.cursor(dictionary=True)
-
-            if id_empleado:
-                cursor.execute(
-                    "SELECT * FROM RegistrodeTiempo WHERE id_empleado = %s",
-                    (id_empleado,))
-            elif id_proyecto:
-                cursor.execute(
-                    "SELECT * FROM RegistrodeTiempo WHERE id_proyecto = %s",
-                    (id_proyecto,))
-            else:
-                cursor.execute("SELECT * FROM RegistrodeTiempo")
+            with db.conexion() as connection, \
+                    closing(connection.cursor()) as cursor:
+
+                if id_empleado:
+                    cursor.execute(
+                        f"{RegistroDeTiempo.SQL_SELECT} WHERE id_empleado = %s",
+                        (id_empleado,))
+                elif id_proyecto:
+                    cursor.execute(
+                        f"{RegistroDeTiempo.SQL_SELECT} WHERE id_proyecto = %s",
+                        (id_proyecto,))
+                else:
+                    cursor.execute(RegistroDeTiempo.SQL_SELECT)
 
-            return cursor.fetchall()
+                return [RegistroDeTiempo._desde_fila(db, row) for row in cursor.fetchall()]
         except Error as e:
             print(f"Error al consultar registros: {e}")
             return []
-        finally:
-            cursor.close()
+
+    # ====================== Reporte =======================
+
+    # Orden de las columnas en las filas del reporte
+    COLUMNAS_REPORTE = ("id_registro", "fecha", "horas", "descripcion",
+                        "id_empleado", "empleado", "id_proyecto", "proyecto")
+
+    SQL_REPORTE = """
+        SELECT r.id_registro, r.fecha, r.horas, r.descripcion,
+               r.id_empleado, e.nombre, r.id_proyecto, p.nombre
+        FROM RegistrodeTiempo r
+        JOIN Empleados e ON e.id_empleado = r.id_empleado
+        JOIN Proyectos p ON p.id_proyecto = r.id_proyecto
+    """
+
+    @staticmethod
+    def _filtros_reporte(fecha_inicio, fecha_fin, id_empleado, id_proyecto):
+        """Arma la cláusula WHERE del reporte y sus parámetros."""
+        condiciones, params = [], []
+        if fecha_inicio:
+            condiciones.append("r.fecha >= %s")
+            params.append(fecha_inicio)
+        if fecha_fin:
+            condiciones.append("r.fecha <= %s")
+            params.append(fecha_fin)
+        if id_empleado:
+            condiciones.append("r.id_empleado = %s")
+            params.append(id_empleado)
+        if id_proyecto:
+            condiciones.append("r.id_proyecto = %s")
+            params.append(id_proyecto)
+        return condiciones, params
+
+    @staticmethod
+    def reporte(db, fecha_inicio=None, fecha_fin=None, id_empleado=None,
+                id_proyecto=None, despues_de=0, limite=100):
+        """Página del reporte con nombres de empleado y proyecto.
+
+        Pagina por id_registro: para la página siguiente se pasa como
+        `despues_de` el id_registro de la última fila recibida. Las filas
+        son tuplas en el orden de COLUMNAS_REPORTE.
+        """
+        condiciones, params = RegistroDeTiempo._filtros_reporte(
+            fecha_inicio, fecha_fin, id_empleado, id_proyecto)
+        condiciones.append("r.id_registro > %s")
+        params.extend([despues_de, limite])
+        sql = (f"{RegistroDeTiempo.SQL_REPORTE} WHERE {' AND '.join(condiciones)} "
+               f"ORDER BY r.id_registro LIMIT %s")
+        try:
+            with db.conexion() as connection, \
+                    closing(connection.cursor()) as cursor:
+                cursor.execute(sql, tuple(params))
+                return cursor.fetchall()
+        except Error as e:
+            print(f"Error al generar reporte: {e}")
+            return []
+
+    @staticmethod
+    def iterar_reporte(db, fecha_inicio=None, fecha_fin=None, id_empleado=None,
+                       id_proyecto=None, tamano_bloque=1000):
+        """Recorre el reporte completo con un cursor sin buffer.
+
+        Las filas se leen del servidor de a `tamano_bloque`, así que la
+        memoria no crece con el tamaño del historial. La conexión queda
+        prestada hasta que el generador termina o se cierra. Un error de
+        base de datos se informa y se vuelve a lanzar, para no confundir un
+        reporte cortado con uno completo.
+        """
+        condiciones, params = RegistroDeTiempo._filtros_reporte(
+            fecha_inicio, fecha_fin, id_empleado, id_proyecto)
+        where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+        sql = f"{RegistroDeTiempo.SQL_REPORTE} {where} ORDER BY r.fecha, r.id_registro"
+        try:
+            for _, filas in db.iterar_bloques(sql, tuple(params), tamano_bloque):
+                yield from filas
+        except Error as e:
+            print(f"Error al generar reporte: {e}")
+            raise
+
+    # ===================== Agregados ======================
+
+    @staticmethod
+    def _agregar(db, sql, params=()):
+        """Ejecuta una consulta de agregación y devuelve las filas como tuplas.
+
+        Devuelve None si la consulta falla, para distinguirlo de un
+        resultado vacío.
+        """
+        try:
+            with db.conexion() as connection, \
+                    closing(connection.cursor()) as cursor:
+                cursor.execute(sql, params)
+                return cursor.fetchall()
+        except Error as e:
+            print(f"Error al calcular totales de horas: {e}")
+            return None
+
+    @staticmethod
+    def horas_por_empleado(db, id_empleado=None):
+        """Total de horas por empleado: [(id_empleado, horas, registros)]."""
+        filtro = "WHERE id_empleado = %s" if id_empleado else ""
+        return RegistroDeTiempo._agregar(db, f"""
+            SELECT id_empleado, SUM(horas), COUNT(*)
+            FROM RegistrodeTiempo {filtro}
+            GROUP BY id_empleado
+            ORDER BY id_empleado
+        """, (id_empleado,) if id_empleado else ())
+
+    @staticmethod
+    def horas_por_proyecto(db, id_proyecto=None):
+        """Total de horas por proyecto: [(id_proyecto, horas, registros)]."""
+        filtro = "WHERE id_proyecto = %s" if id_proyecto else ""
+        return RegistroDeTiempo._agregar(db, f"""
+            SELECT id_proyecto, SUM(horas), COUNT(*)
+            FROM RegistrodeTiempo {filtro}
+            GROUP BY id_proyecto
+            ORDER BY id_proyecto
+        """, (id_proyecto,) if id_proyecto else ())
+
+    @staticmethod
+    def horas_por_mes(db, anio=None):
+        """Total de horas por mes: [(anio, mes, horas, registros)]."""
+        filtro = "WHERE fecha BETWEEN %s AND %s" if anio else ""
+        params = (date(anio, 1, 1), date(anio, 12, 31)) if anio else ()
+        return RegistroDeTiempo._agregar(db, f"""
+            SELECT YEAR(fecha), MONTH(fecha), SUM(horas), COUNT(*)
+            FROM RegistrodeTiempo {filtro}
+            GROUP BY YEAR(fecha), MONTH(fecha)
+            ORDER BY YEAR(fecha), MONTH(fecha)
+        """, params)
+
+    @staticmethod
+    def horas_por_empleado_proyecto(db):
+        """Total de horas por empleado y proyecto: [(id_empleado, id_proyecto, horas, registros)]."""
+        return RegistroDeTiempo._agregar(db, """
+            SELECT id_empleado, id_proyecto, SUM(horas), COUNT(*)
+            FROM RegistrodeTiempo
+            GROUP BY id_empleado, id_proyecto
+            ORDER BY id_empleado, id_proyecto
+        """)
+
+
+def limpiar_caches():
+    """Vacía las cachés en proceso de empleados, departamentos y roles."""
+    for cache in (Empleados.cache, Departamento.cache, Usuario.roles):
+        if cache is not None:
+            cache.limpiar()
+
+
+# Tras revertir una transacción las cachés pueden tener datos no confirmados
+Database.al_revertir.append(limpiar_caches)
@@ -0,0 +1,267 @@
+"""Interfaz de línea de comandos no interactiva de Ecotech Solutions
+
+Pensada para cargas programadas (cron) y scripts. A diferencia de main.py
+no ejecuta el DDL en cada arranque: el esquema solo se crea o migra con
+--crear-tablas / --migrar. Los mensajes informativos se envían a stderr y
+al terminar cada comando se imprime en stdout una línea JSON con el
+resultado y el tiempo empleado.
+
+Ejemplos:
+    python cli.py empleados import empleados.csv
+    python cli.py tiempo import horas.jsonl --tamano-lote 5000
+    python cli.py tiempo report --desde 2024-01-01 --salida reporte.csv
+    python cli.py indicadores sync --desde 2024-01-01 --hasta 2024-12-31
+    python cli.py exportar todo --formato columnar --destino respaldo
+    python cli.py --crear-tablas esquema
+"""
+import argparse
+import csv
+import json
+import sys
+import time
+from contextlib import redirect_stdout
+from datetime import date
+
+from conexiondb import Database
+from clases import Empleados, RegistroDeTiempo
+from indicadores import IndicadorEconomico
+from exportar import TABLAS, EXTENSIONES, exportar_tabla, exportar_todo
+
+
+def _fecha(texto):
+    """Convierte YYYY-MM-DD en date para argparse"""
+    try:
+        return date.fromisoformat(texto)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"fecha inválida: {texto} (use YYYY-MM-DD)")
+
+
+# ===================== Comandos ======================
+# Cada comando recibe (db, args) y devuelve un dict con su resultado,
+# o None si falló. Un dict con "error" indica un fallo con resultado parcial.
+
+def cmd_esquema(db, args):
+    """El esquema ya se preparó con --crear-tablas / --migrar"""
+    return {"indices": db.verificar_indices()} if args.verificar else {}
+
+
+def cmd_empleados_import(db, args):
+    return Empleados.importar_csv(db, args.ruta, args.tamano_lote, args.delimitador)
+
+
+def cmd_tiempo_import(db, args):
+    return RegistroDeTiempo.importar_archivo(db, args.ruta, args.tamano_lote)
+
+
+def cmd_tiempo_report(db, args):
+    """Escribe el reporte detallado en CSV sin cargarlo en memoria
+
+    Un error de base de datos se propaga a main() desde iterar_reporte.
+    """
+    columnas = RegistroDeTiempo.COLUMNAS_REPORTE
+    filas = RegistroDeTiempo.iterar_reporte(
+        db, args.desde, args.hasta, args.empleado, args.proyecto, args.tamano_bloque)
+    try:
+        with open(args.salida, "w", newline="", encoding="utf-8") as archivo:
+            escritor = csv.writer(archivo)
+            escritor.writerow(columnas)
+            total = 0
+            for fila in filas:
+                escritor.writerow(fila)
+                total += 1
+    except OSError as e:
+        print(f"Error al escribir reporte: {e}")
+        return None
+    finally:
+        filas.close()
+    return {"filas": total, "ruta": args.salida}
+
+
+RESUMENES = {
+    "empleado": lambda db, args: RegistroDeTiempo.horas_por_empleado(db),
+    "proyecto": lambda db, args: RegistroDeTiempo.horas_por_proyecto(db),
+    "mes": lambda db, args: RegistroDeTiempo.horas_por_mes(db, args.anio),
+    "empleado-proyecto": lambda db, args: RegistroDeTiempo.horas_por_empleado_proyecto(db),
+}
+
+
+def cmd_tiempo_resumen(db, args):
+    filas = RESUMENES[args.por](db, args)
+    return None if filas is None else {"filas": filas}
+
+
+def cmd_indicadores_sync(db, args):
+    """Descarga indicadores y los guarda (upsert) en la base de datos"""
+    indicador_eco = IndicadorEconomico(db)
+    codigos = args.codigos or [info['codigo']
+                               for info in IndicadorEconomico.INDICADORES.values()]
+
+    guardados, fallidos, sin_descargar = {}, [], []
+    if args.desde:
+        hasta = args.hasta or date.today()
+        for codigo in codigos:
+            serie = indicador_eco.consultar_indicador_periodo(
+                codigo, args.desde, hasta, errores=sin_descargar)
+            guardado = indicador_eco.registrar_serie(serie, args.usuario)
+            if guardado is None:
+                fallidos.append(codigo)
+            guardados[codigo] = guardado or 0
+    else:
+        fecha = args.fecha or date.today()
+        resultados = indicador_eco.consultar_todos(fecha, errores=sin_descargar)
+        sin_descargar = [codigo for codigo in sin_descargar if codigo in codigos]
+        for codigo in codigos:
+            resultado = resultados.get(codigo)
+            guardado = resultado and indicador_eco.registrar_indicador(
+                resultado['nombre'], resultado['fecha'], resultado['valor'],
+                args.usuario)
+            if resultado and guardado is None:
+                fallidos.append(codigo)
+            guardados[codigo] = 1 if guardado else 0
+    salida = {"guardados": guardados, "total": sum(guardados.values())}
+    errores = []
+    if sin_descargar:
+        errores.append(f"no se pudieron descargar: {', '.join(sorted(sin_descargar))}")
+    if fallidos:
+        errores.append(f"no se pudieron guardar: {', '.join(fallidos)}")
+    if errores:
+        salida["error"] = "; ".join(errores)
+    return salida
+
+
+def cmd_exportar(db, args):
+    if args.tabla == "todo":
+        reportes = exportar_todo(db, args.destino or "exportacion", args.formato,
+                                 args.pii, args.tamano_bloque)
+        salida = {"tablas": reportes, "filas": sum(r["filas"] for r in reportes)}
+        fallidas = [t for t in TABLAS if t not in {r["tabla"] for r in reportes}]
+        if fallidas:
+            salida["error"] = f"no se pudieron exportar: {', '.join(fallidas)}"
+        return salida
+    ruta = args.destino or f"{args.tabla}{EXTENSIONES[args.formato]}"
+    return exportar_tabla(db, args.tabla, ruta, args.formato, args.pii,
+                          args.tamano_bloque)
+
+
+# ===================== Parser ======================
+
+def crear_parser():
+    parser = argparse.ArgumentParser(
+        prog="cli.py", description="Operaciones por lotes de Ecotech Solutions")
+    parser.add_argument("--crear-tablas", action="store_true",
+                        help="crear tablas y aplicar migraciones antes del comando")
+    parser.add_argument("--migrar", action="store_true",
+                        help="aplicar migraciones pendientes antes del comando")
+    parser.add_argument("--transaccion", action="store_true",
+                        help="ejecutar el comando en una sola transacción "
+                             "(todo o nada)")
+    parser.add_argument("--pool-max", type=int, default=5,
+                        help="máximo de conexiones del pool (por defecto 5)")
+    entidades = parser.add_subparsers(dest="entidad", required=True)
+
+    esquema = entidades.add_parser("esquema", help="preparar o verificar el esquema")
+    esquema.add_argument("--verificar", action="store_true",
+                         help="comprobar con EXPLAIN que se usan los índices")
+    esquema.set_defaults(comando=cmd_esquema)
+
+    empleados = entidades.add_parser("empleados").add_subparsers(
+        dest="accion", required=True)
+    importar = empleados.add_parser("import", help="importar empleados desde CSV")
+    importar.add_argument("ruta")
+    importar.add_argument("--tamano-lote", type=int, default=1000)
+    importar.add_argument("--delimitador", default=",")
+    importar.set_defaults(comando=cmd_empleados_import)
+
+    tiempo = entidades.add_parser("tiempo").add_subparsers(dest="accion", required=True)
+    importar = tiempo.add_parser("import", help="importar registros desde CSV o JSONL")
+    importar.add_argument("ruta")
+    importar.add_argument("--tamano-lote", type=int, default=1000)
+    importar.set_defaults(comando=cmd_tiempo_import)
+
+    reporte = tiempo.add_parser("report", help="reporte detallado de horas a CSV")
+    reporte.add_argument("--desde", type=_fecha)
+    reporte.add_argument("--hasta", type=_fecha)
+    reporte.add_argument("--empleado", type=int)
+    reporte.add_argument("--proyecto", type=int)
+    reporte.add_argument("--salida", default="reporte_tiempo.csv")
+    reporte.add_argument("--tamano-bloque", type=int, default=1000)
+    reporte.set_defaults(comando=cmd_tiempo_report)
+
+    resumen = tiempo.add_parser("resumen", help="totales de horas agrupados")
+    resumen.add_argument("--por", choices=RESUMENES, default="empleado")
+    resumen.add_argument("--anio", type=int)
+    resumen.set_defaults(comando=cmd_tiempo_resumen)
+
+    indicadores = entidades.add_parser("indicadores").add_subparsers(
+        dest="accion", required=True)
+    sync = indicadores.add_parser("sync", help="descargar y guardar indicadores")
+    sync.add_argument("--codigos", type=lambda s: s.split(","),
+                      help="lista separada por comas (por defecto todos)")
+    sync.add_argument("--fecha", type=_fecha, help="fecha puntual (por defecto hoy)")
+    sync.add_argument("--desde", type=_fecha, help="inicio del periodo")
+    sync.add_argument("--hasta", type=_fecha, help="fin del periodo (por defecto hoy)")
+    sync.add_argument("--usuario", default="cli")
+    sync.set_defaults(comando=cmd_indicadores_sync)
+
+    exportar = entidades.add_parser("exportar", help="exportar tablas a archivo")
+    exportar.add_argument("tabla", choices=[*TABLAS, "todo"])
+    exportar.add_argument("--formato", choices=EXTENSIONES, default="csv")
+    exportar.add_argument("--destino", help="archivo (o directorio con 'todo')")
+    exportar.add_argument("--pii", action="store_true",
+                          help="incluir datos sensibles descifrados de empleados")
+    exportar.add_argument("--tamano-bloque", type=int, default=5000)
+    exportar.set_defaults(comando=cmd_exportar)
+
+    return parser
+
+
+def _nombre_comando(args):
+    return " ".join(p for p in (args.entidad, getattr(args, "accion", None)) if p)
+
+
+def _exito(resultado):
+    """Un comando falla si devuelve None o un dict con la clave error"""
+    return resultado is not None and not (
+        isinstance(resultado, dict) and resultado.get("error"))
+
+
+def main(argv=None):
+    """Ejecuta un comando y devuelve el código de salida (0 si tuvo éxito)"""
+    args = crear_parser().parse_args(argv)
+    db = Database(pool_max=args.pool_max)
+    salida = {"comando": _nombre_comando(args)}
+    inicio = time.perf_counter()
+
+    try:
+        # Los mensajes de las clases van a stderr para no mezclarse con el JSON
+        with redirect_stdout(sys.stderr):
+            if args.crear_tablas or args.migrar:
+                db.conectar()
+                if args.crear_tablas:
+                    db.create_tables()
+                else:
+                    db.migrar()
+            if args.transaccion:
+                with db.transaccion() as transaccion:
+                    resultado = args.comando(db, args)
+                salida["commits_agrupados"] = transaccion.commits_diferidos
+            else:
+                resultado = args.comando(db, args)
+        salida["ok"] = _exito(resultado)
+        salida["resultado"] = resultado
+        if not salida["ok"]:
+            salida["error"] = (resultado or {}).get("error") or "el comando falló"
+    except Exception as e:
+        salida["ok"] = False
+        salida["error"] = str(e)
+    finally:
+        salida["sentencias"] = db.estadisticas_sentencias()
+        db.desconectar()
+
+    salida["segundos"] = round(time.perf_counter() - inicio, 4)
+    print(json.dumps(salida, ensure_ascii=False, default=str))
+    return 0 if salida["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,33 +1,436 @@
 """Módulo conexion a la base de datos"""
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import closing, contextmanager
 import mysql.connector
 from mysql.connector import Error
+from mysql.connector.cursor import MySQLCursorPrepared
+from mysql.connector.errors import PoolError
+try:
+    from mysql.connector.connection_cext import CMySQLConnection
+    from mysql.connector.cursor_cext import CMySQLCursorPrepared
+except ImportError:  # Sin la extensión C solo existe la implementación pura
+    CMySQLConnection = CMySQLCursorPrepared = None
+
+
+class TransaccionAbortada(Error):
+    """Una operación dentro de Database.transaccion() falló y todo se revirtió"""
+
+
+class _ConexionTransaccion:
+    """Conexión entregada por db.conexion() dentro de Database.transaccion()
+
+    Delega todo en la conexión real salvo commit, que se difiere hasta el
+    final del bloque, y rollback, que revierte y marca la transacción
+    como abortada para que las operaciones siguientes no se ejecuten.
+    """
+
+    def __init__(self, conexion):
+        self._conexion = conexion
+        self.commits_diferidos = 0
+        self.abortada = False
+
+    def __getattr__(self, nombre):
+        return getattr(self._conexion, nombre)
+
+    def real(self):
+        """Conexión real, si la transacción sigue activa"""
+        if self.abortada:
+            raise TransaccionAbortada(
+                "La transacción fue revertida; no se ejecutan más operaciones")
+        return self._conexion
+
+    def cursor(self, *args, **kwargs):
+        return self.real().cursor(*args, **kwargs)
+
+    def start_transaction(self, *args, **kwargs):
+        """La transacción ya está abierta: el bloque interno se une a ella"""
+        self.real()
+
+    def commit(self):
+        self.real()
+        self.commits_diferidos += 1
+
+    def rollback(self):
+        if not self.abortada:
+            self.abortada = True
+            self._conexion.rollback()
+
+
+class _CursorPreparado(MySQLCursorPrepared):
+    """Cursor preparado que no envía COM_STMT_RESET al reejecutar
+
+    mysql-connector resetea la sentencia antes de cada execute, un viaje
+    extra al servidor que solo hace falta con datos largos (send_long_data)
+    o con un cursor abierto en el servidor. SentenciasPreparadas no usa
+    ninguno de los dos y siempre lee todas las filas, así que al repetir la
+    misma sentencia se ejecuta directamente; cualquier otro caso pasa por
+    el execute original.
+    """
+
+    def execute(self, operation, params=None, multi=False):
+        if (operation is not self._executed or not self._prepared
+                or not isinstance(params, (tuple, list))
+                or len(params) != len(self._prepared["parameters"])
+                or self._cursor_exists or self._connection.unread_result):
+            return super().execute(operation, params, multi)
+        self._handle_result(self._connection.cmd_stmt_execute(
+            self._prepared["statement_id"], data=params,
+            parameters=self._prepared["parameters"]))
+        return None
+
+
+if CMySQLCursorPrepared is not None:
+    class _CCursorPreparado(CMySQLCursorPrepared):
+        """_CursorPreparado para la extensión C"""
+
+        def execute(self, operation, params=None, multi=False):
+            if (operation is not self._executed or self._stmt is None
+                    or not isinstance(params, (tuple, list))
+                    or len(params) != self._stmt.param_count):
+                return super().execute(operation, params, multi)
+            self._cnx.handle_unread_result(prepared=True)
+            resultado = self._cnx.cmd_stmt_execute(self._stmt, *params)
+            if resultado:
+                self._handle_result(resultado)
+            return None
+
+
+def _clase_cursor_preparado(conexion):
+    """Clase de cursor preparado que corresponde a la conexión"""
+    if CMySQLConnection is not None and isinstance(conexion, CMySQLConnection):
+        return _CCursorPreparado
+    return _CursorPreparado
+
+
+class SentenciasPreparadas:
+    """Registro por conexión de sentencias preparadas en el servidor
+
+    Cada SQL se prepara una sola vez por conexión con un cursor preparado
+    que se conserva entre préstamos; las ejecuciones siguientes solo envían
+    los parámetros (sin COM_STMT_RESET, ver _CursorPreparado). Los cursores se cierran (y la
+    sentencia se libera en el servidor) al olvidar la conexión o al
+    superar `max_por_conexion` sentencias distintas en ella.
+    """
+
+    def __init__(self, max_por_conexion=64):
+        self.max_por_conexion = max_por_conexion
+        # id(conexion) -> (conexion, OrderedDict {sql: (sql, cursor)})
+        self.__registros = {}
+        self.__lock = threading.Lock()
+        self.__stats = {"preparaciones": 0, "ejecuciones": 0, "errores": 0}
+
+    def _sentencias(self, conexion):
+        """Sentencias registradas de una conexión (se crea vacío)"""
+        with self.__lock:
+            registro = self.__registros.get(id(conexion))
+            if registro is None:
+                registro = (conexion, OrderedDict())
+                self.__registros[id(conexion)] = registro
+            return registro[1]
+
+    @staticmethod
+    def _cerrar_cursor(cursor):
+        try:
+            cursor.close()
+        except Error:
+            pass
+
+    def ejecutar(self, conexion, sql, params=()):
+        """Ejecuta `sql` con la sentencia preparada de la conexión
+
+        Devuelve el cursor preparado, que sigue perteneciendo al registro.
+        Solo lo usa el hilo que tiene prestada la conexión.
+        """
+        sentencias = self._sentencias(conexion)
+        entrada = sentencias.get(sql)
+        if entrada is None:
+            # El cursor prepara en su primer execute y reutiliza la sentencia
+            # mientras reciba el mismo objeto SQL, por eso se guarda el original
+            entrada = (sql, conexion.cursor(
+                cursor_class=_clase_cursor_preparado(conexion)))
+            sentencias[sql] = entrada
+            if len(sentencias) > self.max_por_conexion:
+                _, (_, antiguo) = sentencias.popitem(last=False)
+                self._cerrar_cursor(antiguo)
+            nueva = True
+        else:
+            sentencias.move_to_end(sql)
+            nueva = False
+
+        sql_original, cursor = entrada
+        try:
+            cursor.execute(sql_original, params)
+        except Error:
+            sentencias.pop(sql, None)
+            self._cerrar_cursor(cursor)
+            with self.__lock:
+                self.__stats["errores"] += 1
+            raise
+
+        with self.__lock:
+            self.__stats["ejecuciones"] += 1
+            if nueva:
+                self.__stats["preparaciones"] += 1
+        return cursor
+
+    def olvidar(self, conexion):
+        """Cierra las sentencias de una conexión antes de descartarla"""
+        with self.__lock:
+            registro = self.__registros.pop(id(conexion), None)
+        if registro is not None:
+            for _, cursor in registro[1].values():
+                self._cerrar_cursor(cursor)
+
+    def estadisticas(self):
+        """Preparaciones vs ejecuciones y sentencias abiertas"""
+        with self.__lock:
+            stats = dict(self.__stats)
+            stats["conexiones"] = len(self.__registros)
+            stats["sentencias"] = sum(
+                len(sentencias) for _, sentencias in self.__registros.values())
+        stats["reutilizaciones"] = stats["ejecuciones"] - stats["preparaciones"]
+        return stats
+
+
+class PoolConexiones:
+    """Pool de conexiones MySQL con préstamo y devolución por operación"""
+
+    def __init__(self, config, min_conexiones=1, max_conexiones=5,
+                 tiempo_ocioso=30, tiempo_espera=10, al_descartar=None):
+        if min_conexiones < 0 or max_conexiones < 1 or min_conexiones > max_conexiones:
+            raise ValueError(
+                f"Tamaño de pool inválido: min={min_conexiones}, max={max_conexiones}")
+        self.__config = config
+        self.min_conexiones = min_conexiones
+        self.max_conexiones = max_conexiones
+        # Solo se verifica (ping) una conexión que estuvo ociosa más de esto
+        self.tiempo_ocioso = tiempo_ocioso
+        self.tiempo_espera = tiempo_espera
+        # Se llama con la conexión justo antes de cerrarla
+        self.__al_descartar = al_descartar
+        self.__libres = deque()  # (conexion, instante de devolución)
+        self.__total = 0
+        self.__cerrado = False
+        self.__condicion = threading.Condition()
+        self.__stats = {
+            "prestamos": 0,
+            "devoluciones": 0,
+            "creadas": 0,
+            "descartadas": 0,
+            "verificaciones": 0,
+            "esperas": 0,
+        }
+
+        for _ in range(min_conexiones):
+            self.__total += 1
+            self.__libres.append((self._crear(), time.monotonic()))
+
+    def _crear(self):
+        """Abre una conexión nueva con la configuración del pool"""
+        try:
+            conexion = mysql.connector.connect(**self.__config)
+        except Exception:
+            with self.__condicion:
+                self.__total -= 1
+                self.__condicion.notify()
+            raise
+        with self.__condicion:
+            self.__stats["creadas"] += 1
+        return conexion
+
+    def _verificar(self, conexion):
+        """Comprueba que una conexión ociosa siga viva
+
+        Nota: connection.cursor() de mysql-connector (puro y extensión C)
+        también hace ping vía is_connected(); ese ping no se puede evitar
+        sin dejar de usar cursor(). Los cursores preparados de
+        SentenciasPreparadas se crean una vez por conexión y no lo repiten.
+        """
+        with self.__condicion:
+            self.__stats["verificaciones"] += 1
+        try:
+            return conexion.is_connected()
+        except Error:
+            return False
+
+    def _descartar(self, conexion):
+        """Cierra una conexión y libera su cupo en el pool"""
+        if self.__al_descartar is not None:
+            self.__al_descartar(conexion)
+        try:
+            conexion.close()
+        except Error:
+            pass
+        with self.__condicion:
+            self.__total -= 1
+            self.__stats["descartadas"] += 1
+            self.__condicion.notify()
+
+    def obtener(self):
+        """Presta una conexión, esperando si el pool está al máximo"""
+        limite = time.monotonic() + self.tiempo_espera
+        while True:
+            candidata = None
+            with self.__condicion:
+                if self.__cerrado:
+                    raise PoolError("El pool de conexiones está cerrado")
+                if self.__libres:
+                    # LIFO: la última devuelta es la que menos tiempo lleva ociosa
+                    candidata = self.__libres.pop()
+                elif self.__total < self.max_conexiones:
+                    self.__total += 1
+                else:
+                    restante = limite - time.monotonic()
+                    if restante <= 0:
+                        raise PoolError(
+                            "No hay conexiones disponibles en el pool")
+                    self.__stats["esperas"] += 1
+                    self.__condicion.wait(restante)
+                    continue
+
+            if candidata is None:
+                conexion = self._crear()
+            else:
+                conexion, devuelta = candidata
+                ociosa = time.monotonic() - devuelta >= self.tiempo_ocioso
+                if ociosa and not self._verificar(conexion):
+                    self._descartar(conexion)
+                    continue
+
+            with self.__condicion:
+                self.__stats["prestamos"] += 1
+            return conexion
+
+    def devolver(self, conexion, descartar=False):
+        """Devuelve una conexión prestada al pool
+
+        Las conexiones usan autocommit, así que normalmente no queda nada
+        abierto; si una operación dejó una transacción sin cerrar se
+        revierte (in_transaction se lee del último paquete, sin consultar al
+        servidor) para que el siguiente préstamo no herede su instantánea ni
+        sus bloqueos. Si el rollback falla la conexión se descarta. También
+        se descarta si quedó un resultado sin leer: drenarlo obligaría a
+        recibir todas las filas pendientes.
+        """
+        if getattr(conexion, "unread_result", False):
+            descartar = True
+        if not descartar and getattr(conexion, "in_transaction", False):
+            try:
+                conexion.rollback()
+            except Error:
+                descartar = True
+        with self.__condicion:
+            self.__stats["devoluciones"] += 1
+            if not descartar and not self.__cerrado:
+                self.__libres.append((conexion, time.monotonic()))
+                self.__condicion.notify()
+                return
+        self._descartar(conexion)
+
+    def estadisticas(self):
+        """Devuelve un resumen del estado y uso del pool"""
+        with self.__condicion:
+            stats = dict(self.__stats)
+            stats.update({
+                "min_conexiones": self.min_conexiones,
+                "max_conexiones": self.max_conexiones,
+                "abiertas": self.__total,
+                "libres": len(self.__libres),
+                "en_uso": self.__total - len(self.__libres),
+            })
+            return stats
+
+    def cerrar(self):
+        """Cierra las conexiones libres; las prestadas se cierran al devolverse"""
+        with self.__condicion:
+            self.__cerrado = True
+            libres = [conexion for conexion, _ in self.__libres]
+            self.__libres.clear()
+        for conexion in libres:
+            self._descartar(conexion)
 
 
 class Database:
     """Clase para manejar la conexión a la base de datos"""
 
-    def __init__(self):
+    # Funciones sin argumentos que se llaman tras revertir una transacción
+    # (p. ej. para vaciar cachés que pudieron guardar datos no confirmados)
+    al_revertir = []
+
+    # Migraciones de esquema: (versión, descripción, método que la aplica).
+    # Cada método debe ser idempotente, ya que el DDL hace commit implícito.
+    MIGRACIONES = [
+        (1, "Clave única (indicador, fecha) en IndicadoresEconomicos",
+         "_asegurar_clave_indicador"),
+        (2, "Índices para consultas frecuentes", "_crear_indices"),
+    ]
+
+    # Índices secundarios: (tabla, nombre, columnas)
+    INDICES = [
+        ("RegistrodeTiempo", "idx_tiempo_empleado_fecha", "id_empleado, fecha"),
+        ("RegistrodeTiempo", "idx_tiempo_proyecto_fecha", "id_proyecto, fecha"),
+        ("IndicadoresEconomicos", "idx_indicadores_consulta", "fecha_consulta"),
+    ]
+
+    # Consultas frecuentes y el índice que deberían usar según EXPLAIN
+    CONSULTAS_FRECUENTES = [
+        ("Registros por empleado",
+         "SELECT * FROM RegistrodeTiempo WHERE id_empleado = %s", (1,),
+         "idx_tiempo_empleado_fecha"),
+        ("Registros por proyecto",
+         "SELECT * FROM RegistrodeTiempo WHERE id_proyecto = %s", (1,),
+         "idx_tiempo_proyecto_fecha"),
+        ("Historial de indicadores",
+         "SELECT * FROM IndicadoresEconomicos ORDER BY fecha_consulta DESC LIMIT %s",
+         (50,), "idx_indicadores_consulta"),
+        ("Registros por indicador",
+         "SELECT * FROM IndicadoresEconomicos WHERE nombre_indicador IN (%s) "
+         "ORDER BY fecha_valor DESC", ("Dólar observado",), "uq_indicador_fecha"),
+        ("Página de empleados",
+         "SELECT * FROM Empleados WHERE id_empleado > %s "
+         "ORDER BY id_empleado LIMIT %s", (0, 500), "PRIMARY"),
+    ]
+
+    def __init__(self, usar_pool=True, pool_min=1, pool_max=5, tiempo_ocioso=30):
         self.__host = "localhost"
         self.__port = 3308
         self.__user = "root"
         self.__password = ""
         self.__database = "Ecotech_solutions_DB"
         self.__connection = None
+        self.__usar_pool = usar_pool
+        self.__pool_min = pool_min
+        self.__pool_max = pool_max
+        self.__tiempo_ocioso = tiempo_ocioso
+        self.__pool = None
+        self.__pool_lock = threading.Lock()
+        self.__sentencias = SentenciasPreparadas()
+        # Transacción activa (_ConexionTransaccion) de cada hilo
+        self.__local = threading.local()
+
+    def _config(self):
+        """Parámetros de conexión a la base de datos"""
+        return {
+            "host": self.__host,
+            "port": self.__port,
+            "user": self.__user,
+            "password": self.__password,
+            "database": self.__database,
+            # Una lectura no deja una instantánea abierta que haya que revertir
+            # al devolver la conexión; las escrituras de varias sentencias
+            # abren su transacción con start_transaction()
+            "autocommit": True,
+        }
 
     def conectar(self):
         """Establecer conexión con la base de datos"""
         try:
             if self.__connection is None or not self.__connection.is_connected():
-                self.__connection = mysql.connector.connect(
-                    host=self.__host,
-                    port=self.__port,
-                    user=self.__user,
-                    password=self.__password,
-                    database=self.__database
-                )
-
-            if self.__connection.is_connected():
-                return self.__connection
+                self.__connection = mysql.connector.connect(**self._config())
+
+            return self.__connection
         except Error as e:
             if "Unknown database" in str(e):
                 print(
@@ -37,6 +440,160 @@ class Database:
             else:
                 raise Exception(f"Error de conexión: {e}")
 
+    def _obtener_pool(self):
+        """Crea el pool de conexiones en el primer uso"""
+        if self.__pool is None:
+            with self.__pool_lock:
+                if self.__pool is None:
+                    try:
+                        self.__pool = PoolConexiones(
+                            self._config(),
+                            min_conexiones=self.__pool_min,
+                            max_conexiones=self.__pool_max,
+                            tiempo_ocioso=self.__tiempo_ocioso,
+                            al_descartar=self.__sentencias.olvidar
+                        )
+                    except Error as e:
+                        if "Unknown database" not in str(e):
+                            raise
+                        print(
+                            f"Base de datos '{self.__database}' no existe. Creando...")
+                        self._crear_base_datos()
+                        self.__pool = PoolConexiones(
+                            self._config(),
+                            min_conexiones=self.__pool_min,
+                            max_conexiones=self.__pool_max,
+                            tiempo_ocioso=self.__tiempo_ocioso,
+                            al_descartar=self.__sentencias.olvidar
+                        )
+        return self.__pool
+
+    @contextmanager
+    def conexion(self):
+        """Presta una conexión durante una operación y la devuelve al salir.
+
+        Si la operación lanza una excepción con una transacción abierta, se
+        revierte antes de devolverla (en el pool lo hace devolver(), que
+        descarta la conexión si el rollback falla). Dentro de transaccion()
+        se entrega siempre la conexión de la transacción.
+        """
+        activa = getattr(self.__local, "transaccion", None)
+        if activa is not None:
+            try:
+                yield activa
+            except Exception:
+                activa.rollback()
+                raise
+            return
+
+        if not self.__usar_pool:
+            connection = self.conectar()
+            try:
+                yield connection
+            except Exception:
+                if connection.in_transaction:
+                    connection.rollback()
+                raise
+            return
+
+        pool = self._obtener_pool()
+        connection = pool.obtener()
+        try:
+            yield connection
+        finally:
+            pool.devolver(connection)
+
+    @contextmanager
+    def transaccion(self):
+        """Agrupa en una sola transacción todas las operaciones del bloque
+
+        Dentro del bloque db.conexion() entrega siempre la misma conexión y
+        los commit() de los métodos se difieren hasta el final, donde se
+        hace uno solo. Si el bloque lanza una excepción se revierte todo y
+        se relanza esa misma excepción. Si una operación falló pero su
+        error se capturó (los métodos de clases.py lo hacen), se revierte
+        todo y al salir se lanza TransaccionAbortada. Un bloque anidado se
+        une a la transacción externa.
+
+            with db.transaccion():
+                proyecto.crear_proyecto()
+                departamento.crear_departamento()
+        """
+        activa = getattr(self.__local, "transaccion", None)
+        if activa is not None:
+            yield activa
+            return
+
+        with self.conexion() as connection:
+            connection.start_transaction()
+            transaccion = _ConexionTransaccion(connection)
+            self.__local.transaccion = transaccion
+            try:
+                yield transaccion
+                if transaccion.abortada:
+                    raise TransaccionAbortada(
+                        "Una operación falló; la transacción se revirtió")
+                connection.commit()
+            except Exception:
+                transaccion.rollback()
+                for funcion in self.al_revertir:
+                    funcion()
+                raise
+            finally:
+                self.__local.transaccion = None
+
+    def iterar_bloques(self, sql, params=(), tamano_bloque=1000):
+        """Ejecuta una consulta con cursor sin buffer y genera bloques de filas
+
+        Genera tuplas (nombres_columnas, filas) con hasta `tamano_bloque`
+        filas cada una, sin cargar el resultado completo en memoria. La
+        conexión queda prestada hasta que el generador termina o se cierra;
+        si se cierra antes de tiempo, una conexión del pool se descarta en
+        vez de leer el resto del resultado.
+        """
+        del_pool = (self.__usar_pool
+                    and getattr(self.__local, "transaccion", None) is None)
+        with self.conexion() as connection:
+            cursor = connection.cursor(buffered=False)
+            try:
+                cursor.execute(sql, params)
+                columnas = cursor.column_names
+                while True:
+                    filas = cursor.fetchmany(tamano_bloque)
+                    if not filas:
+                        break
+                    yield columnas, filas
+            finally:
+                # Si el consumidor se detuvo antes quedan filas sin leer. La
+                # conexión de una transacción o la única sin pool hay que
+                # drenarlas; la del pool la descarta devolver().
+                if connection.unread_result and not del_pool:
+                    connection.consume_results()
+                if not connection.unread_result:
+                    cursor.close()
+
+    def estadisticas_pool(self):
+        """Devuelve las estadísticas del pool (vacío si no se ha usado)"""
+        if self.__pool is None:
+            return {}
+        return self.__pool.estadisticas()
+
+    def preparada(self, connection, sql, params=()):
+        """Ejecuta `sql` como sentencia preparada y devuelve su cursor
+
+        La sentencia se prepara una vez por conexión y se reutiliza en los
+        siguientes préstamos. El cursor pertenece al registro: no debe
+        cerrarse, y si devuelve filas hay que leerlas todas (fetchall)
+        antes de volver a usar la conexión.
+        """
+        if isinstance(connection, _ConexionTransaccion):
+            connection = connection.real()
+        return self.__sentencias.ejecutar(connection, sql, params)
+
+    def estadisticas_sentencias(self):
+        """Preparaciones vs ejecuciones de las sentencias preparadas"""
+        return self.__sentencias.estadisticas()
+
     def _crear_base_datos(self):
         """Crear la base de datos si no existe"""
         try:
@@ -149,6 +706,7 @@ class Database:
                         usuario_consulta VARCHAR(100),
                         sitio_proveedor VARCHAR(255),
                         id_usuario INT,
+                        UNIQUE KEY uq_indicador_fecha (nombre_indicador, fecha_valor),
                         FOREIGN KEY (id_usuario) REFERENCES Usuario(id_usuario)
                             ON DELETE SET NULL
                     );
@@ -156,6 +714,8 @@ class Database:
                 self.__connection.commit()
                 print("Tabla 'IndicadoresEconomicos' creada (o ya existía).")
 
+                self.migrar()
+
             except Error as e:
                 print(f"Error creando tablas: {e}")
                 raise
@@ -165,9 +725,110 @@ class Database:
         else:
             raise Exception("No hay conexión activa a la base de datos")
 
+    def migrar(self):
+        """Aplica en orden las migraciones de esquema pendientes"""
+        cursor = self.__connection.cursor()
+        try:
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS MigracionesEsquema (
+                    version INT PRIMARY KEY,
+                    descripcion VARCHAR(255) NOT NULL,
+                    fecha_aplicada DATETIME NOT NULL
+                );
+            """)
+            cursor.execute(
+                "SELECT COALESCE(MAX(version), 0) FROM MigracionesEsquema")
+            version_actual = cursor.fetchone()[0]
+
+            for version, descripcion, metodo in self.MIGRACIONES:
+                if version <= version_actual:
+                    continue
+                getattr(self, metodo)(cursor)
+                cursor.execute("""
+                    INSERT INTO MigracionesEsquema (version, descripcion, fecha_aplicada)
+                    VALUES (%s, %s, NOW())
+                """, (version, descripcion))
+                self.__connection.commit()
+                print(f"Migración {version} aplicada: {descripcion}")
+        finally:
+            cursor.close()
+
+    def _crear_indices(self, cursor):
+        """Crea los índices secundarios que aún no existan"""
+        for tabla, nombre, columnas in self.INDICES:
+            cursor.execute("""
+                SELECT COUNT(*) FROM information_schema.statistics
+                WHERE table_schema = DATABASE()
+                  AND table_name = %s AND index_name = %s
+            """, (tabla, nombre))
+            if not cursor.fetchone()[0]:
+                cursor.execute(
+                    f"ALTER TABLE {tabla} ADD INDEX {nombre} ({columnas})")
+                print(f"Índice '{nombre}' creado en {tabla}.")
+
+    def verificar_indices(self):
+        """Ejecuta EXPLAIN sobre las consultas frecuentes y revisa el índice usado
+
+        Devuelve una lista de dicts con la consulta, el índice esperado, el
+        usado por el optimizador y si coinciden. En tablas casi vacías MySQL
+        puede preferir un recorrido completo aunque el índice exista.
+        """
+        resultados = []
+        with self.conexion() as connection, \
+                closing(connection.cursor(dictionary=True)) as cursor:
+            for descripcion, sql, params, esperado in self.CONSULTAS_FRECUENTES:
+                cursor.execute(f"EXPLAIN {sql}", params)
+                plan = cursor.fetchall()
+                usado = plan[0]['key'] if plan else None
+                resultados.append({
+                    "consulta": descripcion,
+                    "esperado": esperado,
+                    "usado": usado,
+                    "ok": usado == esperado
+                })
+                estado = "OK" if usado == esperado else "REVISAR"
+                print(f"[{estado}] {descripcion}: índice {usado or 'ninguno'} "
+                      f"(esperado {esperado})")
+        return resultados
+
+    def _asegurar_clave_indicador(self, cursor):
+        """Agrega la clave única (indicador, fecha) a tablas ya existentes
+
+        Antes de crearla elimina los duplicados, conservando el registro
+        más reciente de cada par.
+        """
+        cursor.execute("""
+            SELECT COUNT(*) FROM information_schema.statistics
+            WHERE table_schema = DATABASE()
+              AND table_name = 'IndicadoresEconomicos'
+              AND index_name = 'uq_indicador_fecha'
+        """)
+        if cursor.fetchone()[0]:
+            return
+
+        cursor.execute("""
+            DELETE a FROM IndicadoresEconomicos a
+            JOIN IndicadoresEconomicos b
+              ON a.nombre_indicador = b.nombre_indicador
+             AND a.fecha_valor = b.fecha_valor
+             AND a.id_indicador < b.id_indicador
+        """)
+        eliminados = cursor.rowcount
+        cursor.execute("""
+            ALTER TABLE IndicadoresEconomicos
+            ADD UNIQUE KEY uq_indicador_fecha (nombre_indicador, fecha_valor)
+        """)
+        self.__connection.commit()
+        print(f"Clave única de indicadores creada "
+              f"({eliminados} duplicados eliminados).")
+
     def desconectar(self):
-        """Cierra la conexión"""
+        """Cierra la conexión y el pool"""
+        if self.__pool is not None:
+            self.__pool.cerrar()
+            self.__pool = None
         if self.__connection and self.__connection.is_connected():
+            self.__sentencias.olvidar(self.__connection)
             self.__connection.close()
             self.__connection = None
 
@@ -0,0 +1,233 @@
+"""Módulo de exportación de tablas a CSV y a formato columnar binario"""
+import csv
+import json
+import os
+import struct
+import time
+import zlib
+from mysql.connector import Error
+
+from clases import (_aes_decrypt_lote, Empleados, Departamento, Proyecto,
+                    RegistroDeTiempo)
+
+
+# Consultas de exportación por entidad. Los datos sensibles de Empleados
+# solo se exportan (descifrados) cuando se pide explícitamente.
+TABLAS = {
+    "empleados": "SELECT id_empleado, nombre, fecha_contratacion, salario "
+                 "FROM Empleados ORDER BY id_empleado",
+    "proyectos": f"{Proyecto.SQL_SELECT} ORDER BY id_proyecto",
+    "departamentos": f"{Departamento.SQL_SELECT} ORDER BY id_departamento",
+    "registros": f"{RegistroDeTiempo.SQL_SELECT} ORDER BY id_registro",
+    "usuarios": "SELECT id_usuario, nombre_usuario, rol, id_empleado "
+                "FROM Usuario ORDER BY id_usuario",
+    "indicadores": "SELECT id_indicador, nombre_indicador, fecha_valor, valor, "
+                   "fecha_consulta, usuario_consulta, sitio_proveedor, id_usuario "
+                   "FROM IndicadoresEconomicos ORDER BY id_indicador",
+}
+
+SQL_EMPLEADOS_PII = f"{Empleados.SQL_SELECT} ORDER BY id_empleado"
+COLUMNAS_PII = ("direccion", "telefono", "email")
+
+EXTENSIONES = {"csv": ".csv", "columnar": ".ecol"}
+
+
+class EscritorCSV:
+    """Escribe bloques de filas en un archivo CSV con encabezado"""
+
+    def __init__(self, ruta):
+        self.__archivo = open(ruta, "w", newline="", encoding="utf-8")
+        self.__escritor = csv.writer(self.__archivo)
+        self.__con_encabezado = False
+
+    def escribir_bloque(self, columnas, filas):
+        if not self.__con_encabezado:
+            self.__escritor.writerow(columnas)
+            self.__con_encabezado = True
+        self.__escritor.writerows(filas)
+
+    def cerrar(self):
+        self.__archivo.close()
+
+
+class EscritorColumnar:
+    """Escribe bloques de filas en formato columnar binario comprimido
+
+    Estructura del archivo:
+        MAGICO | largo + JSON {"columnas": [...]} | bloques... | 0
+    Cada bloque es la cantidad de filas (uint32) seguida, por columna, de un
+    byte de tipo, el largo (uint32) y los datos comprimidos con zlib:
+    máscara de nulos (un byte por fila) y los valores de la columna.
+    Tipos: 'i' enteros int64, 'f' float64, 's' texto UTF-8, 'b' bytes
+    (offsets uint32 seguidos del contenido); fechas y decimales se guardan
+    como texto para no perder precisión. Todos los números van en
+    little-endian, así el archivo se lee igual en cualquier plataforma.
+    """
+    MAGICO = b"ECOL1\n"
+
+    def __init__(self, ruta):
+        self.__archivo = open(ruta, "wb")
+        self.__archivo.write(self.MAGICO)
+        self.__columnas = None
+
+    @staticmethod
+    def _tipo(valores):
+        """Elige el tipo de la columna a partir de sus valores no nulos"""
+        presentes = [v for v in valores if v is not None]
+        if presentes and all(type(v) is int for v in presentes):
+            return "i"
+        if presentes and all(type(v) is float for v in presentes):
+            return "f"
+        if presentes and all(isinstance(v, (bytes, bytearray)) for v in presentes):
+            return "b"
+        return "s"
+
+    @staticmethod
+    def _codificar(tipo, valores):
+        """Serializa una columna de un bloque (sin comprimir)"""
+        nulos = bytes(1 if v is None else 0 for v in valores)
+        if tipo == "i":
+            datos = struct.pack(f"<{len(valores)}q",
+                                *(0 if v is None else v for v in valores))
+        elif tipo == "f":
+            datos = struct.pack(f"<{len(valores)}d",
+                                *(0.0 if v is None else v for v in valores))
+        else:
+            if tipo == "s":
+                partes = [b"" if v is None else str(v).encode("utf-8")
+                          for v in valores]
+            else:
+                partes = [b"" if v is None else bytes(v) for v in valores]
+            offsets = [0]
+            for parte in partes:
+                offsets.append(offsets[-1] + len(parte))
+            datos = struct.pack(f"<{len(offsets)}I", *offsets) + b"".join(partes)
+        return nulos + datos
+
+    def escribir_bloque(self, columnas, filas):
+        if self.__columnas is None:
+            self.__columnas = list(columnas)
+            encabezado = json.dumps({"columnas": self.__columnas}).encode("utf-8")
+            self.__archivo.write(struct.pack("<I", len(encabezado)))
+            self.__archivo.write(encabezado)
+
+        self.__archivo.write(struct.pack("<I", len(filas)))
+        for valores in zip(*filas):
+            tipo = self._tipo(valores)
+            datos = zlib.compress(self._codificar(tipo, valores))
+            self.__archivo.write(tipo.encode("ascii"))
+            self.__archivo.write(struct.pack("<I", len(datos)))
+            self.__archivo.write(datos)
+
+    def cerrar(self):
+        if self.__columnas is None:
+            encabezado = json.dumps({"columnas": []}).encode("utf-8")
+            self.__archivo.write(struct.pack("<I", len(encabezado)))
+            self.__archivo.write(encabezado)
+        self.__archivo.write(struct.pack("<I", 0))
+        self.__archivo.close()
+
+
+def leer_columnar(ruta):
+    """Lee un archivo columnar y genera (columnas, filas) por bloque"""
+    with open(ruta, "rb") as archivo:
+        if archivo.read(len(EscritorColumnar.MAGICO)) != EscritorColumnar.MAGICO:
+            raise ValueError(f"{ruta} no es un archivo columnar válido")
+        largo, = struct.unpack("<I", archivo.read(4))
+        columnas = json.loads(archivo.read(largo))["columnas"]
+
+        while True:
+            n, = struct.unpack("<I", archivo.read(4))
+            if n == 0:
+                return
+            datos_columnas = []
+            for _ in columnas:
+                tipo = archivo.read(1).decode("ascii")
+                largo, = struct.unpack("<I", archivo.read(4))
+                datos = zlib.decompress(archivo.read(largo))
+                nulos, datos = datos[:n], datos[n:]
+
+                if tipo in ("i", "f"):
+                    valores = struct.unpack(f"<{n}{'q' if tipo == 'i' else 'd'}", datos)
+                else:
+                    offsets = struct.unpack(f"<{n + 1}I", datos[:4 * (n + 1)])
+                    contenido = datos[4 * (n + 1):]
+                    valores = [contenido[offsets[i]:offsets[i + 1]] for i in range(n)]
+                    if tipo == "s":
+                        valores = [v.decode("utf-8") for v in valores]
+                datos_columnas.append(
+                    [None if nulos[i] else valores[i] for i in range(n)])
+            yield columnas, list(zip(*datos_columnas))
+
+
+def _descifrar_bloque(columnas, filas):
+    """Reemplaza las columnas cifradas de Empleados por su texto plano"""
+    filas = [list(fila) for fila in filas]
+    for nombre in COLUMNAS_PII:
+        i = columnas.index(nombre)
+        textos = _aes_decrypt_lote([fila[i] for fila in filas])
+        for fila, texto in zip(filas, textos):
+            fila[i] = texto
+    return filas
+
+
+def exportar_tabla(db, tabla, ruta, formato="csv", incluir_pii=False,
+                   tamano_bloque=5000):
+    """Exporta una tabla en bloques con memoria constante
+
+    Devuelve un reporte con filas exportadas, segundos y filas/s, o None
+    si la tabla o el formato no existen o hubo un error.
+    """
+    if tabla not in TABLAS:
+        print(f"Tabla desconocida: {tabla}. Disponibles: {', '.join(TABLAS)}")
+        return None
+    if formato not in EXTENSIONES:
+        print(f"Formato desconocido: {formato}. Disponibles: {', '.join(EXTENSIONES)}")
+        return None
+
+    con_pii = incluir_pii and tabla == "empleados"
+    sql = SQL_EMPLEADOS_PII if con_pii else TABLAS[tabla]
+    try:
+        escritor = EscritorCSV(ruta) if formato == "csv" else EscritorColumnar(ruta)
+    except OSError as e:
+        print(f"Error al crear {ruta}: {e}")
+        return None
+    filas_exportadas = 0
+    inicio = time.perf_counter()
+
+    try:
+        for columnas, filas in db.iterar_bloques(sql, tamano_bloque=tamano_bloque):
+            if con_pii:
+                filas = _descifrar_bloque(columnas, filas)
+            escritor.escribir_bloque(columnas, filas)
+            filas_exportadas += len(filas)
+    except (Error, OSError) as e:
+        print(f"Error al exportar {tabla}: {e}")
+        return None
+    finally:
+        escritor.cerrar()
+
+    segundos = time.perf_counter() - inicio
+    filas_por_segundo = filas_exportadas / segundos if segundos > 0 else 0.0
+    print(f"{tabla}: {filas_exportadas} filas exportadas a {ruta} en "
+          f"{segundos:.2f} s ({filas_por_segundo:,.0f} filas/s)")
+    return {
+        "tabla": tabla,
+        "ruta": ruta,
+        "filas": filas_exportadas,
+        "segundos": segundos,
+        "filas_por_segundo": filas_por_segundo
+    }
+
+
+def exportar_todo(db, directorio, formato="csv", incluir_pii=False,
+                  tamano_bloque=5000):
+    """Exporta todas las tablas a un directorio; devuelve los reportes"""
+    os.makedirs(directorio, exist_ok=True)
+    reportes = []
+    for tabla in TABLAS:
+        ruta = os.path.join(directorio, f"{tabla}{EXTENSIONES.get(formato, '')}")
+        reporte = exportar_tabla(db, tabla, ruta, formato, incluir_pii, tamano_bloque)
+        if reporte:
+            reportes.append(reporte)
+    return reportes
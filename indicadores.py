@@ -1,9 +1,134 @@
 """Módulo para consulta y almacenamiento de indicadores económicos"""
+import atexit
+import json
+import os
+import threading
+import time
+import unicodedata
 import requests
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
 from datetime import datetime, date
 from mysql.connector import Error
 
 
+def _normalizar(texto):
+    """Pasa a minúsculas y quita acentos para comparar nombres"""
+    descompuesto = unicodedata.normalize("NFKD", texto.lower())
+    return "".join(c for c in descompuesto if not unicodedata.combining(c))
+
+
+class CacheIndicadores:
+    """Caché persistente en disco de respuestas de la API de indicadores
+
+    Las entradas de fechas pasadas no vencen (sus valores no cambian); las
+    de hoy, o las consultas sin datos, vencen tras `ttl` segundos. Los
+    guardados se escriben a disco por lotes (ver guardar_cambios) y lo
+    pendiente se escribe al terminar el proceso.
+    """
+    # Fuera del código fuente; se puede cambiar con ECOTECH_CACHE_INDICADORES
+    RUTA_DEFECTO = os.environ.get("ECOTECH_CACHE_INDICADORES") or os.path.join(
+        os.path.expanduser("~"), ".cache", "ecotech", "cache_indicadores.json")
+
+    # Guardados que se acumulan antes de reescribir el archivo
+    ESCRITURAS_POR_LOTE = 20
+
+    # Segundos que se conserva una entrada vencida como respaldo si la API
+    # no responde; pasado ese plazo se elimina al escribir
+    RETENCION = 86400
+
+    def __init__(self, ruta=RUTA_DEFECTO, ttl=900):
+        self.ruta = ruta
+        self.ttl = ttl
+        self.__lock = threading.Lock()
+        self.__lock_archivo = threading.Lock()
+        self.__pendientes = 0
+        self.__datos = self._cargar()
+        atexit.register(self.guardar_cambios)
+
+    def _cargar(self):
+        """Lee el archivo de caché; si no existe o está dañado parte vacía"""
+        try:
+            with open(self.ruta, encoding="utf-8") as archivo:
+                return self._podar(json.load(archivo))
+        except (OSError, ValueError):
+            return {}
+
+    def _podar(self, datos):
+        """Descarta las entradas vencidas hace más de RETENCION segundos"""
+        limite = time.time() - self.RETENCION
+        return {clave: entrada for clave, entrada in datos.items()
+                if entrada.get("vence") is None or entrada["vence"] > limite}
+
+    def guardar_cambios(self):
+        """Escribe a disco los guardados pendientes, de forma atómica
+
+        El contenido se serializa bajo el lock de los datos, pero la
+        escritura del archivo no lo retiene: obtener() y guardar() siguen
+        atendiendo mientras tanto.
+        """
+        with self.__lock_archivo:
+            with self.__lock:
+                if not self.__pendientes:
+                    return
+                self.__datos = self._podar(self.__datos)
+                contenido = json.dumps(self.__datos)
+                self.__pendientes = 0
+            temporal = f"{self.ruta}.{os.getpid()}.tmp"
+            try:
+                directorio = os.path.dirname(self.ruta)
+                if directorio:
+                    os.makedirs(directorio, exist_ok=True)
+                with open(temporal, "w", encoding="utf-8") as archivo:
+                    archivo.write(contenido)
+                os.replace(temporal, self.ruta)
+            except OSError as e:
+                print(f"No se pudo guardar la caché de indicadores: {e}")
+
+    def vigencia(self, fecha, con_datos=True):
+        """Instante de vencimiento para una entrada (None = no vence)"""
+        if con_datos and fecha < date.today():
+            return None
+        return time.time() + self.ttl
+
+    def obtener(self, clave, incluir_vencidas=False):
+        """Devuelve (encontrado, valor) para una clave"""
+        with self.__lock:
+            entrada = self.__datos.get(clave)
+        if entrada is None:
+            return False, None
+        vence = entrada.get("vence")
+        if vence is not None and vence < time.time() and not incluir_vencidas:
+            return False, None
+        return True, entrada["valor"]
+
+    def guardar(self, clave, valor, vence=None):
+        """Guarda un valor serializable en JSON; se persiste por lotes"""
+        with self.__lock:
+            self.__datos[clave] = {"valor": valor, "vence": vence}
+            self.__pendientes += 1
+            lote_completo = self.__pendientes >= self.ESCRITURAS_POR_LOTE
+        if lote_completo:
+            self.guardar_cambios()
+
+    def limpiar(self):
+        """Elimina todas las entradas de la caché"""
+        with self.__lock:
+            self.__datos = {}
+            self.__pendientes += 1
+        self.guardar_cambios()
+
+
+# Fila de los listados de IndicadoresEconomicos: tupla con acceso por nombre
+RegistroIndicador = namedtuple("RegistroIndicador", (
+    "id_indicador", "nombre_indicador", "fecha_valor", "valor",
+    "fecha_consulta", "usuario_consulta", "sitio_proveedor"))
+SQL_REGISTROS = (f"SELECT {', '.join(RegistroIndicador._fields)} "
+                 "FROM IndicadoresEconomicos")
+
+
 class IndicadorEconomico:
     """Clase para gestionar indicadores económicos desde API externa"""
     INDICADORES = {
@@ -17,16 +142,20 @@ class IndicadorEconomico:
 
     API_BASE_URL = "https://mindicador.cl/api"
 
-    def __init__(self, db, api_key=None):
+    def __init__(self, db, api_key=None, cache=None, timeout=10):
         self.db = db
+        self.cache = cache if cache is not None else CacheIndicadores()
         self.sitio_proveedor = "https://mindicador.cl"
         self.api_key = api_key
+        self.timeout = timeout
         self.headers = {
             'User-Agent': 'EcoTech-Solutions/1.0',
             'Accept': 'application/json'
         }
         if self.api_key:
             self.headers['Authorization'] = f'Bearer {self.api_key}'
+        # Sesión compartida: reutiliza conexiones keep-alive entre consultas
+        self.session = requests.Session()
 
     @classmethod
     def mostrar_indicadores(cls):
@@ -36,8 +165,18 @@ class IndicadorEconomico:
             print(f"{key}. {value['nombre']}")
         print("=" * 50)
 
-    def consultar_indicador_fecha(self, codigo_indicador, fecha):
-        """Consulta el valor de un indicador en una fecha específica"""
+    def consultar_indicador_fecha(self, codigo_indicador, fecha, errores=None):
+        """Consulta el valor de un indicador en una fecha específica
+
+        Si se pasa la lista `errores`, se le agrega el código cuando la
+        consulta falla (y no hay valor en caché), para distinguir el fallo
+        de una fecha sin datos; en ambos casos se devuelve None.
+        """
+        clave = f"{codigo_indicador}/{fecha.isoformat()}"
+        encontrado, resultado = self.cache.obtener(clave)
+        if encontrado:
+            return resultado
+
         try:
             # Formato de la API: /api/{indicador}/{dd-mm-yyyy}
             fecha_str = fecha.strftime("%d-%m-%Y")
@@ -45,7 +184,8 @@ class IndicadorEconomico:
 
             print(f"\n Consultando: {url}")
 
-            response = requests.get(url, headers=self.headers, timeout=10)
+            response = self.session.get(
+                url, headers=self.headers, timeout=self.timeout)
             response.raise_for_status()
 
             data = response.json()
@@ -53,89 +193,182 @@ class IndicadorEconomico:
             # La API devuelve un objeto con 'serie' que es una lista
             if 'serie' in data and len(data['serie']) > 0:
                 valor_dato = data['serie'][0]
-                return {
+                resultado = {
                     'nombre': data.get('nombre', codigo_indicador.upper()),
                     'codigo': data.get('codigo', codigo_indicador),
                     'fecha': valor_dato.get('fecha', ''),
                     'valor': valor_dato.get('valor', 0),
                     'unidad_medida': data.get('unidad_medida', '')
                 }
+                self.cache.guardar(clave, resultado, self.cache.vigencia(fecha))
+                return resultado
             else:
                 print(
                     f"No se encontraron datos para {codigo_indicador} en {fecha_str}")
+                self.cache.guardar(
+                    clave, None, self.cache.vigencia(fecha, con_datos=False))
                 return None
 
         except requests.exceptions.RequestException as e:
             print(f"Error al consultar API: {e}")
+            # Sin conexión: se usa el último valor conocido aunque esté vencido
+            encontrado, resultado = self.cache.obtener(
+                clave, incluir_vencidas=True)
+            if encontrado and resultado:
+                print("Usando valor almacenado en caché.")
+                return resultado
+            if errores is not None:
+                errores.append(codigo_indicador)
             return None
         except Exception as e:
             print(f"Error inesperado: {e}")
+            if errores is not None:
+                errores.append(codigo_indicador)
             return None
 
-    def consultar_indicador_periodo(self, codigo_indicador, fecha_inicio, fecha_fin):
-        """Consulta valores de un indicador en un periodo"""
-        try:
-            # Obtener año para consulta
-            url = f"{self.API_BASE_URL}/{codigo_indicador}"
+    def consultar_todos(self, fecha, max_hilos=6, errores=None):
+        """Consulta todos los indicadores de una fecha en paralelo
 
-            print(f"\n Consultando periodo: {url}")
+        Devuelve un dict {codigo: resultado}; los indicadores que fallen o
+        no tengan datos quedan con valor None sin afectar al resto. Los
+        códigos que fallaron se agregan a `errores`, si se pasa.
+        """
+        codigos = [info['codigo'] for info in self.INDICADORES.values()]
+        with ThreadPoolExecutor(max_workers=max_hilos) as executor:
+            futuros = {
+                codigo: executor.submit(
+                    self.consultar_indicador_fecha, codigo, fecha, errores)
+                for codigo in codigos
+            }
+        self.cache.guardar_cambios()
+        return {codigo: futuro.result() for codigo, futuro in futuros.items()}
 
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
+    def _consultar_anio(self, codigo_indicador, anio):
+        """Obtiene la serie de un año ordenada por fecha, usando la caché
 
-            data = response.json()
+        Devuelve un dict con los datos del indicador y 'puntos', una lista
+        ascendente de [dia_iso, fecha_api, valor].
+        """
+        clave = f"{codigo_indicador}/{anio}"
+        encontrado, serie = self.cache.obtener(clave)
+        if encontrado:
+            return serie
 
-            resultados = []
+        # Formato de la API: /api/{indicador}/{yyyy}
+        url = f"{self.API_BASE_URL}/{codigo_indicador}/{anio}"
+        print(f"\n Consultando periodo: {url}")
 
-            if 'serie' in data:
-                for valor_dato in data['serie']:
-                    fecha_valor_str = valor_dato.get('fecha', '')
-                    fecha_valor = datetime.fromisoformat(
-                        fecha_valor_str.replace('Z', '+00:00')
-                    ).date()
+        response = self.session.get(
+            url, headers=self.headers, timeout=self.timeout)
+        response.raise_for_status()
+        data = response.json()
 
-                    # Filtrar por rango de fechas
-                    if fecha_inicio <= fecha_valor <= fecha_fin:
-                        resultados.append({
-                            'nombre': data.get('nombre', codigo_indicador.upper()),
-                            'codigo': data.get('codigo', codigo_indicador),
-                            'fecha': fecha_valor_str,
-                            'valor': valor_dato.get('valor', 0),
-                            'unidad_medida': data.get('unidad_medida', '')
-                        })
+        puntos = []
+        for valor_dato in data.get('serie', []):
+            fecha_valor_str = valor_dato.get('fecha', '')
+            dia = datetime.fromisoformat(
+                fecha_valor_str.replace('Z', '+00:00')
+            ).date().isoformat()
+            puntos.append([dia, fecha_valor_str, valor_dato.get('valor', 0)])
+        # La API entrega la serie de más reciente a más antigua
+        puntos.sort()
 
-                # Ordenar por fecha
-                resultados.sort(key=lambda x: x['fecha'])
+        serie = {
+            'nombre': data.get('nombre', codigo_indicador.upper()),
+            'codigo': data.get('codigo', codigo_indicador),
+            'unidad_medida': data.get('unidad_medida', ''),
+            'puntos': puntos
+        }
+        # Los años cerrados no cambian; el año en curso vence con el TTL
+        vence = None if anio < date.today().year else time.time() + self.cache.ttl
+        self.cache.guardar(clave, serie, vence)
+        return serie
 
-            return resultados
+    def consultar_indicador_periodo(self, codigo_indicador, fecha_inicio, fecha_fin,
+                                    max_hilos=6, errores=None):
+        """Consulta valores de un indicador en un periodo
 
-        except requests.exceptions.RequestException as e:
-            print(f"Error al consultar API: {e}")
-            return []
-        except Exception as e:
-            print(f"Error inesperado: {e}")
+        Descarga solo los años que cubre el rango (en paralelo y reutilizando
+        la caché) y como cada año ya viene ordenado, basta concatenarlos en
+        orden de año para obtener la serie completa ordenada. Los años que
+        no se pudieron descargar se agregan a `errores` como "codigo/año".
+        """
+        if fecha_inicio > fecha_fin:
             return []
+        anios = list(range(fecha_inicio.year, fecha_fin.year + 1))
+        desde, hasta = fecha_inicio.isoformat(), fecha_fin.isoformat()
 
-    def registrar_indicador(self, nombre_indicador, fecha_valor, valor, usuario_consulta, id_usuario=None):
-        """Registra un indicador económico en la base de datos"""
-        sql = """
-            INSERT INTO IndicadoresEconomicos 
-            (nombre_indicador, fecha_valor, valor, fecha_consulta, usuario_consulta, sitio_proveedor, id_usuario)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-        """
+        with ThreadPoolExecutor(max_workers=min(len(anios), max_hilos)) as executor:
+            futuros = [
+                (anio, executor.submit(self._consultar_anio, codigo_indicador, anio))
+                for anio in anios
+            ]
+        self.cache.guardar_cambios()
+
+        resultados = []
+        for anio, futuro in futuros:
+            try:
+                serie = futuro.result()
+            except requests.exceptions.RequestException as e:
+                print(f"Error al consultar API ({anio}): {e}")
+                if errores is not None:
+                    errores.append(f"{codigo_indicador}/{anio}")
+                continue
+            except Exception as e:
+                print(f"Error inesperado ({anio}): {e}")
+                if errores is not None:
+                    errores.append(f"{codigo_indicador}/{anio}")
+                continue
+
+            puntos = serie['puntos']
+            dias = [punto[0] for punto in puntos]
+            inicio = bisect_left(dias, desde)
+            fin = bisect_right(dias, hasta)
+            for _, fecha_valor_str, valor in puntos[inicio:fin]:
+                resultados.append({
+                    'nombre': serie['nombre'],
+                    'codigo': serie['codigo'],
+                    'fecha': fecha_valor_str,
+                    'valor': valor,
+                    'unidad_medida': serie['unidad_medida']
+                })
+
+        return resultados
+
+    # Upsert sobre la clave única (nombre_indicador, fecha_valor); el
+    # LAST_INSERT_ID(id) hace que lastrowid apunte al registro actualizado
+    SQL_REGISTRAR = """
+        INSERT INTO IndicadoresEconomicos 
+        (nombre_indicador, fecha_valor, valor, fecha_consulta, usuario_consulta, sitio_proveedor, id_usuario)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            id_indicador = LAST_INSERT_ID(id_indicador),
+            valor = VALUES(valor),
+            fecha_consulta = VALUES(fecha_consulta),
+            usuario_consulta = VALUES(usuario_consulta),
+            sitio_proveedor = VALUES(sitio_proveedor),
+            id_usuario = VALUES(id_usuario)
+    """
+
+    @staticmethod
+    def _fecha_valor(fecha_valor):
+        """Convierte la fecha ISO de la API en date"""
         if isinstance(fecha_valor, str):
             try:
                 fecha_valor = datetime.fromisoformat(
                     fecha_valor.replace('Z', '+00:00')
                 ).date()
-            except:
+            except ValueError:
                 fecha_valor = date.today()
+        return fecha_valor
 
+    def registrar_indicador(self, nombre_indicador, fecha_valor, valor, usuario_consulta, id_usuario=None):
+        """Registra un indicador económico en la base de datos"""
         fecha_consulta = datetime.now()
 
         values = (
             nombre_indicador,
-            fecha_valor,
+            self._fecha_valor(fecha_valor),
             valor,
             fecha_consulta,
             usuario_consulta,
@@ -144,53 +377,97 @@ class IndicadorEconomico:
         )
 
         try:
-            connection = self.db.conectar()
-            cursor = connection.cursor()
-            cursor.execute(sql, values)
-            connection.commit()
-            id_registro = cursor.lastrowid
-            print(
-                f"Indicador '{nombre_indicador}' registrado con ID: {id_registro}")
-            return id_registro
+            with self.db.conexion() as connection, \
+                    closing(connection.cursor()) as cursor:
+                cursor.execute(self.SQL_REGISTRAR, values)
+                connection.commit()
+                id_registro = cursor.lastrowid
+                print(
+                    f"Indicador '{nombre_indicador}' registrado con ID: {id_registro}")
+                return id_registro
         except Error as e:
-            connection.rollback()
             print(f"Error al registrar indicador: {e}")
             return None
-        finally:
-            cursor.close()
+
+    def registrar_serie(self, resultados, usuario_consulta, id_usuario=None):
+        """Registra una serie completa en una sola transacción
+
+        `resultados` es la lista que devuelve consultar_indicador_periodo.
+        Los pares (indicador, fecha) ya guardados se actualizan en lugar de
+        duplicarse. Devuelve la cantidad de registros guardados, o None si
+        no se pudo guardar.
+        """
+        fecha_consulta = datetime.now()
+        values = [
+            (
+                res['nombre'],
+                self._fecha_valor(res['fecha']),
+                res['valor'],
+                fecha_consulta,
+                usuario_consulta,
+                self.sitio_proveedor,
+                id_usuario
+            )
+            for res in resultados
+        ]
+        if not values:
+            return 0
+
+        try:
+            with self.db.conexion() as connection, \
+                    closing(connection.cursor()) as cursor:
+                connection.start_transaction()
+                cursor.executemany(self.SQL_REGISTRAR, values)
+                connection.commit()
+                print(f"Serie registrada: {len(values)} valores")
+                return len(values)
+        except Error as e:
+            print(f"Error al registrar serie: {e}")
+            return None
 
     @staticmethod
     def listar_registros(db, limite=50):
-        """Lista los últimos registros de indicadores"""
+        """Lista los últimos registros de indicadores como RegistroIndicador"""
         try:
-            connection = db.conectar()
-            cursor = connection.cursor(dictionary=True)
-            cursor.execute("""
-                SELECT * FROM IndicadoresEconomicos 
-                ORDER BY fecha_consulta DESC 
-                LIMIT %s
-            """, (limite,))
-            return cursor.fetchall()
+            with db.conexion() as connection, \
+                    closing(connection.cursor()) as cursor:
+                cursor.execute(f"""
+                    {SQL_REGISTROS}
+                    ORDER BY fecha_consulta DESC 
+                    LIMIT %s
+                """, (limite,))
+                return list(map(RegistroIndicador._make, cursor.fetchall()))
         except Error as e:
             print(f"Error al listar indicadores: {e}")
             return []
-        finally:
-            cursor.close()
 
     @staticmethod
     def consultar_por_indicador(db, nombre_indicador):
-        """Consulta registros de un indicador específico"""
+        """Consulta registros de un indicador específico
+
+        La búsqueda parcial se resuelve contra los nombres distintos (pocos,
+        leídos desde el índice) y luego se filtra con IN, evitando un LIKE
+        con comodín inicial que obliga a recorrer toda la tabla.
+        """
         try:
-            connection = db.conectar()
-            cursor = connection.cursor(dictionary=True)
-            cursor.execute("""
-                SELECT * FROM IndicadoresEconomicos 
-                WHERE nombre_indicador LIKE %s
-                ORDER BY fecha_valor DESC
-            """, (f"%{nombre_indicador}%",))
-            return cursor.fetchall()
+            with db.conexion() as connection, \
+                    closing(connection.cursor()) as cursor:
+                cursor.execute(
+                    "SELECT DISTINCT nombre_indicador FROM IndicadoresEconomicos")
+                # Igual que la collation de MySQL: sin distinguir mayúsculas ni acentos
+                buscado = _normalizar(nombre_indicador)
+                nombres = [nombre for nombre, in cursor.fetchall()
+                           if buscado in _normalizar(nombre)]
+                if not nombres:
+                    return []
+
+                marcadores = ", ".join(["%s"] * len(nombres))
+                cursor.execute(f"""
+                    {SQL_REGISTROS}
+                    WHERE nombre_indicador IN ({marcadores})
+                    ORDER BY fecha_valor DESC
+                """, tuple(nombres))
+                return list(map(RegistroIndicador._make, cursor.fetchall()))
         except Error as e:
             print(f"Error al consultar indicador: {e}")
             return []
-        finally:
-            cursor.close()
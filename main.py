@@ -3,7 +3,9 @@
 from conexiondb import Database
 from clases import Empleados, Usuario, Departamento, Proyecto, RegistroDeTiempo
 from indicadores import IndicadorEconomico
+from exportar import TABLAS, EXTENSIONES, exportar_tabla, exportar_todo
 from datetime import datetime, date
+from mysql.connector import Error
 
 
 def mostrar_menu_principal():
@@ -17,6 +19,7 @@ def mostrar_menu_principal():
     print("4.  Gestión de Proyectos")
     print("5.  Registro de Tiempo")
     print("6.  Indicadores Económicos")
+    print("7.  Exportar Datos")
     print("0.  Salir del Sistema")
     print("="*60)
 
@@ -32,6 +35,7 @@ def menu_empleados(db):
         print("3. Buscar empleado por ID")
         print("4. Actualizar empleado")
         print("5. Eliminar empleado")
+        print("6. Importar empleados desde CSV")
         print("0. Volver al menú principal")
         print("="*60)
 
@@ -51,11 +55,11 @@ def menu_empleados(db):
 
         elif opcion == "2":
             print("\n--- LISTA DE EMPLEADOS ---")
-            empleados = Empleados.listar_empleados(db)
-            if empleados:
-                for emp in empleados:
-                    print(f"\n{emp}")
-            else:
+            total = 0
+            for emp in Empleados.iterar_empleados(db):
+                print(f"\n{emp}")
+                total += 1
+            if not total:
                 print("No hay empleados registrados.")
 
         elif opcion == "3":
@@ -110,14 +114,27 @@ def menu_empleados(db):
             else:
                 print("Operación cancelada.")
 
+        elif opcion == "6":
+            print("\n--- IMPORTAR EMPLEADOS DESDE CSV ---")
+            print("Columnas: nombre, direccion, telefono, email, salario "
+                  "[, fecha_contratacion]")
+            ruta = input("Ruta del archivo CSV: ").strip()
+            tamano = input("Tamaño de lote [1000]: ").strip()
+            tamano = int(tamano) if tamano else 1000
+            reporte = Empleados.importar_csv(db, ruta, tamano_lote=tamano)
+            if reporte and reporte['detalle_rechazos']:
+                print("\nFilas rechazadas:")
+                for numero, motivo in reporte['detalle_rechazos']:
+                    print(f"  Fila {numero}: {motivo}")
+
         elif opcion == "0":
             break
         else:
             print("Opción inválida.")
 
 
-def menu_usuarios(db):
-    """Menú de gestión de usuarios"""
+def menu_usuarios(db, usuario_actual=None):
+    """Menú de gestión de usuarios; devuelve el usuario con sesión abierta"""
     while True:
         print("\n" + "="*60)
         print("    GESTIÓN DE USUARIOS")
@@ -125,6 +142,7 @@ def menu_usuarios(db):
         print("1. Registrar nuevo usuario")
         print("2. Listar usuarios")
         print("3. Autenticar usuario")
+        print("4. Cerrar sesión")
         print("0. Volver al menú principal")
         print("="*60)
 
@@ -148,8 +166,8 @@ def menu_usuarios(db):
             usuarios = Usuario.listar_usuarios(db)
             if usuarios:
                 for usr in usuarios:
-                    print(f"ID: {usr['id_usuario']}, Usuario: {usr['nombre_usuario']}, "
-                          f"Rol: {usr['rol']}, ID Empleado: {usr['id_empleado']}")
+                    print(f"ID: {usr.id_usuario}, Usuario: {usr.nombre_usuario}, "
+                          f"Rol: {usr.rol}, ID Empleado: {usr.id_empleado}")
             else:
                 print("No hay usuarios registrados.")
 
@@ -160,11 +178,22 @@ def menu_usuarios(db):
 
             usuario = Usuario(
                 db, nombre_usuario=nombre_usuario, password=password)
-            if usuario.autenticar():
+            if usuario.iniciar_sesion():
                 print(f"Autenticación exitosa. Rol: {usuario.rol}")
+                if usuario_actual:
+                    usuario_actual.cerrar_sesion()
+                usuario_actual = usuario
+
+        elif opcion == "4":
+            if usuario_actual:
+                usuario_actual.cerrar_sesion()
+                print(f"Sesión de {usuario_actual.nombre_usuario} cerrada.")
+                usuario_actual = None
+            else:
+                print("No hay una sesión abierta.")
 
         elif opcion == "0":
-            break
+            return usuario_actual
         else:
             print("Opción inválida.")
 
@@ -206,9 +235,9 @@ def menu_departamentos(db):
             departamentos = Departamento.listar_departamentos(db)
             if departamentos:
                 for dept in departamentos:
-                    print(f"ID: {dept['id_departamento']}, Nombre: {dept['nombre']}, "
-                          f"Gerente: {dept['gerente']}, ID Empleado: {dept['id_empleado']}, "
-                          f"ID Proyecto: {dept['id_proyecto']}")
+                    print(f"ID: {dept.id_departamento}, Nombre: {dept.nombre}, "
+                          f"Gerente: {dept.gerente}, ID Empleado: {dept.id_empleado}, "
+                          f"ID Proyecto: {dept.id_proyecto}")
             else:
                 print("No hay departamentos registrados.")
 
@@ -288,9 +317,9 @@ def menu_proyectos(db):
             proyectos = Proyecto.listar_proyectos(db)
             if proyectos:
                 for proy in proyectos:
-                    print(f"ID: {proy['id_proyecto']}, Nombre: {proy['nombre']}, "
-                          f"Inicio: {proy['fecha_inicio']}, Término: {proy['fecha_termino']}")
-                    print(f"  Descripción: {proy['descripcion']}\n")
+                    print(f"ID: {proy.id_proyecto}, Nombre: {proy.nombre}, "
+                          f"Inicio: {proy.fecha_inicio}, Término: {proy.fecha_termino}")
+                    print(f"  Descripción: {proy.descripcion}\n")
             else:
                 print("No hay proyectos registrados.")
 
@@ -314,6 +343,12 @@ def menu_proyectos(db):
             print("Opción inválida.")
 
 
+def _etiqueta(entidades, id_entidad):
+    """ID con el nombre de la entidad, si fue encontrada"""
+    entidad = entidades.get(id_entidad)
+    return f"{id_entidad} ({entidad.nombre})" if entidad else str(id_entidad)
+
+
 def menu_registro_tiempo(db):
     """Menú de registro de tiempo"""
     while True:
@@ -324,6 +359,9 @@ def menu_registro_tiempo(db):
         print("2. Listar todos los registros")
         print("3. Consultar por empleado")
         print("4. Consultar por proyecto")
+        print("5. Resumen de horas")
+        print("6. Importar registros desde archivo (CSV/JSONL)")
+        print("7. Reporte detallado por rango de fechas")
         print("0. Volver al menú principal")
         print("="*60)
 
@@ -349,11 +387,16 @@ def menu_registro_tiempo(db):
             print("\n--- TODOS LOS REGISTROS ---")
             registros = RegistroDeTiempo.listar_registros(db)
             if registros:
+                empleados = Empleados.buscar_por_ids(
+                    db, {r.id_empleado for r in registros})
+                proyectos = Proyecto.buscar_por_ids(
+                    db, {r.id_proyecto for r in registros})
                 for reg in registros:
-                    print(f"ID: {reg['id_registro']}, Fecha: {reg['fecha']}, "
-                          f"Horas: {reg['horas']}, Empleado: {reg['id_empleado']}, "
-                          f"Proyecto: {reg['id_proyecto']}")
-                    print(f"  Descripción: {reg['descripcion']}\n")
+                    print(f"ID: {reg.id_registro}, Fecha: {reg.fecha}, "
+                          f"Horas: {reg.horas}, "
+                          f"Empleado: {_etiqueta(empleados, reg.id_empleado)}, "
+                          f"Proyecto: {_etiqueta(proyectos, reg.id_proyecto)}")
+                    print(f"  Descripción: {reg.descripcion}\n")
             else:
                 print("No hay registros de tiempo.")
 
@@ -363,11 +406,13 @@ def menu_registro_tiempo(db):
             registros = RegistroDeTiempo.consultar_registro(
                 db, id_empleado=id_empleado)
             if registros:
-                total_horas = sum(r['horas'] for r in registros)
+                total_horas = sum(r.horas for r in registros)
+                proyectos = Proyecto.buscar_por_ids(
+                    db, {r.id_proyecto for r in registros})
                 print(f"\nRegistros del empleado {id_empleado}:")
                 for reg in registros:
-                    print(
-                        f"  {reg['fecha']}: {reg['horas']} horas - Proyecto {reg['id_proyecto']}")
+                    print(f"  {reg.fecha}: {reg.horas} horas - "
+                          f"Proyecto {_etiqueta(proyectos, reg.id_proyecto)}")
                 print(f"\nTotal horas: {total_horas}")
             else:
                 print("No hay registros para este empleado.")
@@ -378,21 +423,104 @@ def menu_registro_tiempo(db):
             registros = RegistroDeTiempo.consultar_registro(
                 db, id_proyecto=id_proyecto)
             if registros:
-                total_horas = sum(r['horas'] for r in registros)
+                total_horas = sum(r.horas for r in registros)
+                empleados = Empleados.buscar_por_ids(
+                    db, {r.id_empleado for r in registros})
                 print(f"\nRegistros del proyecto {id_proyecto}:")
                 for reg in registros:
-                    print(
-                        f"  {reg['fecha']}: {reg['horas']} horas - Empleado {reg['id_empleado']}")
+                    print(f"  {reg.fecha}: {reg.horas} horas - "
+                          f"Empleado {_etiqueta(empleados, reg.id_empleado)}")
                 print(f"\nTotal horas: {total_horas}")
             else:
                 print("No hay registros para este proyecto.")
 
+        elif opcion == "5":
+            print("\n--- RESUMEN DE HORAS ---")
+            print("1. Por empleado")
+            print("2. Por proyecto")
+            print("3. Por mes")
+            print("4. Por empleado y proyecto")
+            tipo = input("\nSeleccione el resumen: ").strip()
+
+            if tipo == "1":
+                totales = RegistroDeTiempo.horas_por_empleado(db) or []
+                empleados = Empleados.buscar_por_ids(db, [t[0] for t in totales])
+                for id_emp, horas, cantidad in totales:
+                    print(f"Empleado {_etiqueta(empleados, id_emp)}: "
+                          f"{horas} horas ({cantidad} registros)")
+            elif tipo == "2":
+                totales = RegistroDeTiempo.horas_por_proyecto(db) or []
+                proyectos = Proyecto.buscar_por_ids(db, [t[0] for t in totales])
+                for id_proy, horas, cantidad in totales:
+                    print(f"Proyecto {_etiqueta(proyectos, id_proy)}: "
+                          f"{horas} horas ({cantidad} registros)")
+            elif tipo == "3":
+                anio = input("Año (dejar vacío para todos): ").strip()
+                anio = int(anio) if anio else None
+                for anio_reg, mes, horas, cantidad in RegistroDeTiempo.horas_por_mes(db, anio) or []:
+                    print(f"{anio_reg}-{mes:02d}: {horas} horas ({cantidad} registros)")
+            elif tipo == "4":
+                totales = RegistroDeTiempo.horas_por_empleado_proyecto(db) or []
+                empleados = Empleados.buscar_por_ids(db, {t[0] for t in totales})
+                proyectos = Proyecto.buscar_por_ids(db, {t[1] for t in totales})
+                for id_emp, id_proy, horas, cantidad in totales:
+                    print(f"Empleado {_etiqueta(empleados, id_emp)} - "
+                          f"Proyecto {_etiqueta(proyectos, id_proy)}: {horas} horas "
+                          f"({cantidad} registros)")
+            else:
+                print("Opción inválida.")
+
+        elif opcion == "6":
+            print("\n--- IMPORTAR REGISTROS DE TIEMPO ---")
+            print("Campos: fecha, horas, id_empleado, id_proyecto [, descripcion]")
+            ruta = input("Ruta del archivo (.csv o .jsonl): ").strip()
+            reporte = RegistroDeTiempo.importar_archivo(db, ruta)
+            if reporte and reporte['detalle_rechazos']:
+                print("\nFilas rechazadas:")
+                for numero, motivo in reporte['detalle_rechazos']:
+                    print(f"  Fila {numero}: {motivo}")
+
+        elif opcion == "7":
+            print("\n--- REPORTE DETALLADO ---")
+            try:
+                fecha_inicio = input("Fecha inicio (YYYY-MM-DD) [sin límite]: ").strip()
+                fecha_fin = input("Fecha fin (YYYY-MM-DD) [sin límite]: ").strip()
+                fecha_inicio = datetime.strptime(
+                    fecha_inicio, "%Y-%m-%d").date() if fecha_inicio else None
+                fecha_fin = datetime.strptime(
+                    fecha_fin, "%Y-%m-%d").date() if fecha_fin else None
+            except ValueError:
+                print("Formato de fecha inválido.")
+                continue
+
+            total_horas = 0
+            cantidad = 0
+            try:
+                for (id_reg, fecha, horas, descripcion, _, empleado,
+                     _, proyecto) in RegistroDeTiempo.iterar_reporte(db, fecha_inicio, fecha_fin):
+                    print(f"{fecha} | {empleado} | {proyecto} | {horas} horas | {descripcion}")
+                    total_horas += horas
+                    cantidad += 1
+            except Error:
+                continue
+            if cantidad:
+                print(f"\n{cantidad} registros, total horas: {total_horas}")
+            else:
+                print("No hay registros en el rango indicado.")
+
         elif opcion == "0":
             break
         else:
             print("Opción inválida.")
 
 
+def _usuario_en_sesion(db, usuario_actual):
+    """Devuelve el usuario si su sesión sigue vigente"""
+    if usuario_actual is None:
+        return None
+    return Usuario.desde_sesion(db, usuario_actual.token)
+
+
 def menu_indicadores(db, usuario_actual=None):
     """Menú de indicadores económicos"""
     indicador_eco = IndicadorEconomico(db)
@@ -405,6 +533,7 @@ def menu_indicadores(db, usuario_actual=None):
         print("2. Consultar indicador por periodo")
         print("3. Ver historial de registros")
         print("4. Consultar registros por indicador")
+        print("5. Consultar todos los indicadores por fecha")
         print("0. Volver al menú principal")
         print("="*60)
 
@@ -450,13 +579,19 @@ def menu_indicadores(db, usuario_actual=None):
                 guardar = input(
                     "\n¿Desea guardar este registro? (s/n): ").strip().lower()
                 if guardar == 's':
-                    nombre_usuario = input(
-                        "Ingrese su nombre de usuario: ").strip()
+                    sesion = _usuario_en_sesion(db, usuario_actual)
+                    if sesion:
+                        nombre_usuario, id_usuario = sesion.nombre_usuario, sesion.id_usuario
+                    else:
+                        nombre_usuario = input(
+                            "Ingrese su nombre de usuario: ").strip()
+                        id_usuario = None
                     indicador_eco.registrar_indicador(
                         nombre_indicador=resultado['nombre'],
                         fecha_valor=resultado['fecha'],
                         valor=resultado['valor'],
-                        usuario_consulta=nombre_usuario
+                        usuario_consulta=nombre_usuario,
+                        id_usuario=id_usuario
                     )
             else:
                 print("No se pudo obtener el indicador.")
@@ -509,21 +644,21 @@ def menu_indicadores(db, usuario_actual=None):
                     guardar = input(
                         "\n¿Desea guardar estos registros? (s/n): ").strip().lower()
                     if guardar == 's':
-                        nombre_usuario = input(
-                            "Ingrese su nombre de usuario: ").strip()
-
-                        contador = 0
-                        for res in resultados:
-                            if indicador_eco.registrar_indicador(
-                                nombre_indicador=res['nombre'],
-                                fecha_valor=res['fecha'],
-                                valor=res['valor'],
-                                usuario_consulta=nombre_usuario
-                            ):
-                                contador += 1
-
-                        print(
-                            f"\n✓ Se guardaron {contador} registros exitosamente.")
+                        sesion = _usuario_en_sesion(db, usuario_actual)
+                        if sesion:
+                            nombre_usuario, id_usuario = sesion.nombre_usuario, sesion.id_usuario
+                        else:
+                            nombre_usuario = input(
+                                "Ingrese su nombre de usuario: ").strip()
+                            id_usuario = None
+
+                        contador = indicador_eco.registrar_serie(
+                            resultados, usuario_consulta=nombre_usuario,
+                            id_usuario=id_usuario)
+
+                        if contador is not None:
+                            print(
+                                f"\n✓ Se guardaron {contador} registros exitosamente.")
                 else:
                     print("No se encontraron datos para el periodo especificado.")
 
@@ -540,12 +675,12 @@ def menu_indicadores(db, usuario_actual=None):
                 print(f"{'='*80}")
                 for reg in registros:
                     print(
-                        f"ID: {reg['id_indicador']} | {reg['nombre_indicador']}")
+                        f"ID: {reg.id_indicador} | {reg.nombre_indicador}")
                     print(
-                        f"  Fecha valor: {reg['fecha_valor']} | Valor: {reg['valor']}")
+                        f"  Fecha valor: {reg.fecha_valor} | Valor: {reg.valor}")
                     print(
-                        f"  Consultado por: {reg['usuario_consulta']} el {reg['fecha_consulta']}")
-                    print(f"  Proveedor: {reg['sitio_proveedor']}")
+                        f"  Consultado por: {reg.usuario_consulta} el {reg.fecha_consulta}")
+                    print(f"  Proveedor: {reg.sitio_proveedor}")
                     print("-" * 80)
             else:
                 print("No hay registros guardados.")
@@ -563,19 +698,70 @@ def menu_indicadores(db, usuario_actual=None):
                 print(f"{'='*80}")
                 for reg in registros:
                     print(
-                        f"Fecha: {reg['fecha_valor']} | Valor: {reg['valor']}")
+                        f"Fecha: {reg.fecha_valor} | Valor: {reg.valor}")
                     print(
-                        f"Consultado por: {reg['usuario_consulta']} el {reg['fecha_consulta']}")
+                        f"Consultado por: {reg.usuario_consulta} el {reg.fecha_consulta}")
                     print("-" * 80)
             else:
                 print("No se encontraron registros.")
 
+        elif opcion == "5":
+            print("\n--- TODOS LOS INDICADORES POR FECHA ---")
+            fecha_str = input("Ingrese fecha (YYYY-MM-DD) [hoy]: ").strip()
+            if fecha_str:
+                try:
+                    fecha = datetime.strptime(fecha_str, "%Y-%m-%d").date()
+                except ValueError:
+                    print("Formato de fecha inválido.")
+                    continue
+            else:
+                fecha = date.today()
+
+            resultados = indicador_eco.consultar_todos(fecha)
+
+            print(f"\n{'='*60}")
+            print(f"Indicadores al {fecha}")
+            print(f"{'='*60}")
+            for info in IndicadorEconomico.INDICADORES.values():
+                resultado = resultados.get(info['codigo'])
+                if resultado:
+                    print(f"{info['nombre']}: {resultado['valor']} "
+                          f"{resultado.get('unidad_medida', '')}")
+                else:
+                    print(f"{info['nombre']}: sin datos")
+
         elif opcion == "0":
             break
         else:
             print("Opción inválida.")
 
 
+def menu_exportar(db):
+    """Menú de exportación de datos"""
+    print("\n" + "="*60)
+    print("    EXPORTAR DATOS")
+    print("="*60)
+    print(f"Tablas: {', '.join(TABLAS)}")
+
+    tabla = input("Tabla a exportar (Enter para todas): ").strip().lower()
+    formato = input("Formato (csv/columnar) [csv]: ").strip().lower() or "csv"
+    if formato not in EXTENSIONES:
+        print("Formato inválido.")
+        return
+
+    incluir_pii = False
+    if tabla in ("", "empleados"):
+        incluir_pii = input("¿Incluir datos sensibles descifrados? (s/n): ").strip().lower() == "s"
+
+    if tabla:
+        ruta = input("Archivo de destino: ").strip() or f"{tabla}{EXTENSIONES[formato]}"
+        exportar_tabla(db, tabla, ruta, formato, incluir_pii)
+    else:
+        directorio = input("Directorio de destino [exportacion]: ").strip() or "exportacion"
+        reportes = exportar_todo(db, directorio, formato, incluir_pii)
+        print(f"\n{len(reportes)} tablas exportadas a {directorio}.")
+
+
 def main():
     """Función principal del sistema"""
     print("\n" + "="*60)
@@ -591,6 +777,7 @@ def main():
             print("Conexión a la base de datos.")
             db.create_tables()
             print("Esquema de base de datos listo.")
+            usuario_actual = None
 
             while True:
                 mostrar_menu_principal()
@@ -599,7 +786,7 @@ def main():
                 if opcion == "1":
                     menu_empleados(db)
                 elif opcion == "2":
-                    menu_usuarios(db)
+                    usuario_actual = menu_usuarios(db, usuario_actual)
                 elif opcion == "3":
                     menu_departamentos(db)
                 elif opcion == "4":
@@ -607,7 +794,9 @@ def main():
                 elif opcion == "5":
                     menu_registro_tiempo(db)
                 elif opcion == "6":
-                    menu_indicadores(db)
+                    menu_indicadores(db, usuario_actual)
+                elif opcion == "7":
+                    menu_exportar(db)
                 elif opcion == "0":
                     print("\n¡Gracias por usar el sistema!")
                     print("Cerrando conexión a la base de datos...")
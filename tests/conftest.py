@@ -0,0 +1,83 @@
+import os
+import sys
+
+import mysql.connector
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class CursorFalso:
+    def __init__(self, conexion):
+        self.conexion = conexion
+        self.lastrowid = 1
+        self.column_names = ()
+
+    def execute(self, sql, params=None):
+        self.conexion.sentencias.append((sql, params))
+
+    def executemany(self, sql, filas):
+        self.conexion.sentencias.append((sql, list(filas)))
+
+    def fetchall(self):
+        filas, self.conexion.filas = self.conexion.filas, []
+        return filas
+
+    def fetchmany(self, n):
+        filas = self.conexion.filas[:n]
+        del self.conexion.filas[:n]
+        self.conexion.unread_result = bool(self.conexion.filas)
+        return filas
+
+    def close(self):
+        pass
+
+
+class ConexionFalsa:
+    """Conexión MySQL mínima que registra sentencias, commits y rollbacks"""
+    in_transaction = False
+    unread_result = False
+
+    def __init__(self):
+        self.sentencias = []
+        self.filas = []
+        self.inicios = 0
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self, **kwargs):
+        return CursorFalso(self)
+
+    def start_transaction(self):
+        self.inicios += 1
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def consume_results(self):
+        self.filas = []
+        self.unread_result = False
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        self.cerrada = True
+
+
+@pytest.fixture
+def conexiones(monkeypatch):
+    """Reemplaza mysql.connector.connect; devuelve las conexiones abiertas"""
+    abiertas = []
+
+    def conectar(**config):
+        conexion = ConexionFalsa()
+        conexion.config = config
+        abiertas.append(conexion)
+        return conexion
+
+    monkeypatch.setattr(mysql.connector, "connect", conectar)
+    return abiertas
@@ -0,0 +1,95 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from asincrono import DatabaseAsync, ProyectoAsync
+
+
+def test_llamadas_concurrentes_limitadas_al_pool(conexiones):
+    activas, maximo = [0], [0]
+    lock = threading.Lock()
+
+    def operacion(i):
+        with lock:
+            activas[0] += 1
+            maximo[0] = max(maximo[0], activas[0])
+        time.sleep(0.02)
+        with lock:
+            activas[0] -= 1
+        return i
+
+    async def main():
+        async with DatabaseAsync(pool_max=2) as db:
+            resultados = await asyncio.gather(*(db.en_hilo(operacion, i) for i in range(8)))
+            return resultados, db.estadisticas()
+
+    resultados, stats = asyncio.run(main())
+    assert resultados == list(range(8))
+    assert maximo[0] == 2
+    assert stats["operaciones"] == 8
+    assert stats["esperas"] > 0
+
+
+def test_transaccion_hace_un_solo_commit_en_un_hilo(conexiones):
+    async def main():
+        async with DatabaseAsync(pool_max=2) as db:
+            hilos = set()
+            async with db.transaccion() as transaccion:
+                for nombre in ("a", "b"):
+                    await ProyectoAsync(db, nombre=nombre).crear_proyecto()
+                    hilos.add(await db.en_hilo(threading.get_ident))
+                async with db.transaccion():
+                    await ProyectoAsync(db, nombre="c").crear_proyecto()
+            return transaccion, hilos
+
+    transaccion, hilos = asyncio.run(main())
+    assert len(hilos) == 1
+    assert transaccion.commits_diferidos == 3
+    assert [c.commits for c in conexiones] == [1]
+    assert [c.rollbacks for c in conexiones] == [0]
+
+
+def test_transaccion_revierte_y_relanza(conexiones):
+    async def main():
+        async with DatabaseAsync(pool_max=2) as db:
+            async with db.transaccion():
+                await ProyectoAsync(db, nombre="a").crear_proyecto()
+                raise ValueError("falla")
+
+    with pytest.raises(ValueError, match="falla"):
+        asyncio.run(main())
+    assert [c.commits for c in conexiones] == [0]
+    assert conexiones[0].rollbacks == 1
+
+
+def test_operaciones_dentro_de_una_iteracion(conexiones):
+    async def main():
+        async with DatabaseAsync(pool_max=1) as db:
+            vistos = []
+            async for numero in db.iterar(iter(range(5)), tamano_lote=2):
+                vistos.append(await db.en_hilo(lambda n=numero: n * 10))
+            return vistos
+
+    vistos = asyncio.run(asyncio.wait_for(main(), timeout=5))
+    assert vistos == [0, 10, 20, 30, 40]
+
+
+def test_iteracion_cortada_cierra_el_generador(conexiones):
+    cerrado = []
+
+    def generador():
+        try:
+            yield from range(10)
+        finally:
+            cerrado.append(True)
+
+    async def main():
+        async with DatabaseAsync(pool_max=1) as db:
+            async for numero in db.iterar(generador(), tamano_lote=3):
+                if numero == 4:
+                    break
+
+    asyncio.run(main())
+    assert cerrado == [True]
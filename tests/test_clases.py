@@ -0,0 +1,82 @@
+import csv
+import io
+import json
+
+from conexiondb import Database
+from clases import CacheLRU, Empleados, SesionesUsuario, _aes_encrypt_ecb
+
+
+def test_importar_empleados_rechaza_filas_invalidas(conexiones):
+    contenido = io.StringIO(
+        "nombre,direccion,telefono,email,salario\n"
+        "Ana,Calle 1,123\n"
+        "Bruno,Calle 2,456,bruno@eco.cl,1000\n"
+        "Carla,Calle 3,789,carla@eco.cl,mucho\n"
+        "Diego,Calle 4,012,diego@eco.cl,2000\n")
+
+    reporte = Empleados.registrar_lote(
+        Database(pool_max=1), csv.DictReader(contenido), tamano_lote=1)
+
+    assert reporte["insertados"] == 2
+    assert reporte["rechazados"] == 2
+    assert [numero for numero, _ in reporte["detalle_rechazos"]] == [1, 3]
+    assert "email" in reporte["detalle_rechazos"][0][1]
+    assert reporte["error"] is None
+    insertados = [fila for _, filas in conexiones[0].sentencias for fila in filas]
+    assert [fila[0] for fila in insertados] == ["Bruno", "Diego"]
+    assert all(isinstance(fila[1], bytes) for fila in insertados)
+    assert conexiones[0].inicios == conexiones[0].commits == 2
+
+
+class UsuarioFalso:
+    id_usuario = 1
+    nombre_usuario = "ana"
+    rol = "admin"
+    id_empleado = None
+
+
+def test_sesiones_compartidas_no_se_pisan_y_se_podan(tmp_path):
+    ruta = str(tmp_path / "sesiones.json")
+    proceso_a = SesionesUsuario(ruta=ruta)
+    proceso_b = SesionesUsuario(ruta=ruta)
+    vencida = SesionesUsuario(ttl=-1, ruta=ruta).crear(UsuarioFalso())
+
+    token_a = proceso_a.crear(UsuarioFalso())
+    token_b = proceso_b.crear(UsuarioFalso())
+    proceso_b.cerrar(token_a)
+
+    nuevo = SesionesUsuario(ruta=ruta)
+    assert nuevo.validar(token_a) is None
+    assert nuevo.validar(token_b) is not None
+    assert proceso_a.validar(token_b) is not None
+    with open(ruta, encoding="utf-8") as archivo:
+        assert len(json.load(archivo)) == 1
+    assert nuevo.validar(vencida) is None
+
+
+def test_empleado_devuelve_a_bytes_los_blobs_decodificados():
+    blob = _aes_encrypt_ecb("Calle 1")
+    fila = (1, "Ana", "ñandú", blob, None, None, 100.0)
+
+    emp = Empleados._desde_fila(None, fila)
+
+    assert emp._direccion_cifrada == "ñandú".encode("utf-8")
+    assert emp._telefono_cifrado is blob
+    assert emp._email_cifrada is None
+    assert emp.telefono == "Calle 1"
+
+
+def test_buscar_por_ids_lee_solo_los_que_faltan_en_cache(conexiones, monkeypatch):
+    monkeypatch.setattr(Empleados, "cache", CacheLRU(max_elementos=10, ttl=300))
+    db = Database(pool_max=1)
+    fila = (1, "Ana", b"", b"", b"", None, 100.0)
+    Empleados.cache.guardar(1, fila)
+    with db.conexion() as connection:
+        connection.filas = [(2, "Luis", b"", b"", b"", None, 90.0),
+                            (3, "Eva", b"", b"", b"", None, 80.0)]
+
+    empleados = Empleados.buscar_por_ids(db, [1, 2, 3])
+
+    assert sorted(empleados) == [1, 2, 3]
+    assert [params for _, params in connection.sentencias] == [(2, 3)]
+    assert Empleados.cache.obtener(3)[1] == "Eva"
@@ -0,0 +1,32 @@
+import json
+
+import pytest
+import requests
+
+import cli
+from indicadores import CacheIndicadores
+
+
+@pytest.fixture
+def api_caida(monkeypatch, tmp_path):
+    """La API de indicadores no responde y la caché parte vacía"""
+    def get(*args, **kwargs):
+        raise requests.exceptions.ConnectionError("sin conexión")
+
+    monkeypatch.setattr(requests.Session, "get", get)
+    monkeypatch.setattr(CacheIndicadores.__init__, "__defaults__",
+                        (str(tmp_path / "cache.json"), 900))
+
+
+@pytest.mark.parametrize("argumentos", [
+    ["indicadores", "sync", "--fecha", "2024-03-01"],
+    ["indicadores", "sync", "--desde", "2023-06-01", "--hasta", "2024-02-01"],
+])
+def test_sync_falla_si_la_api_no_responde(conexiones, api_caida, capsys, argumentos):
+    codigo = cli.main(argumentos)
+
+    salida = json.loads(capsys.readouterr().out)
+    assert codigo == 1
+    assert salida["ok"] is False
+    assert "no se pudieron descargar" in salida["error"]
+    assert "dolar" in salida["error"]
@@ -0,0 +1,125 @@
+from types import SimpleNamespace
+
+import pytest
+from mysql.connector import Error
+from mysql.connector.connection import MySQLConnection
+
+from conexiondb import Database, SentenciasPreparadas, TransaccionAbortada
+from clases import Empleados, Proyecto, Usuario
+
+
+def conexion_registrada(log):
+    """Conexión pura sin servidor cuyos comandos de sentencia se registran"""
+    conexion = MySQLConnection()
+    conexion.is_connected = lambda: True
+    conexion.cmd_stmt_prepare = lambda sql: (
+        log.append("prepare"), {"statement_id": 1, "parameters": [None], "columns": []})[1]
+    conexion.cmd_stmt_reset = lambda statement_id: log.append("reset")
+    conexion.cmd_stmt_execute = lambda statement_id, data=(), parameters=(): (
+        log.append(("execute", data)),
+        {"affected_rows": 1, "insert_id": 7, "warning_count": 0, "server_status": 0})[1]
+    conexion.cmd_stmt_close = lambda statement_id: log.append("close")
+    return conexion
+
+
+def conexion_c_registrada(log):
+    """Igual que conexion_registrada, con la extensión C"""
+    connection_cext = pytest.importorskip("mysql.connector.connection_cext")
+    conexion = connection_cext.CMySQLConnection()
+    conexion.is_connected = lambda: True
+    conexion.is_closed = lambda: False
+    conexion.cmd_stmt_prepare = lambda sql: (
+        log.append("prepare"), SimpleNamespace(param_count=1, have_result_set=False))[1]
+    conexion.cmd_stmt_reset = lambda stmt: log.append("reset")
+    conexion.cmd_stmt_execute = lambda stmt, *params: (
+        log.append(("execute", params)),
+        {"affected_rows": 1, "insert_id": 7, "warning_count": 0})[1]
+    conexion.cmd_stmt_close = lambda stmt: log.append("close")
+    return conexion
+
+
+@pytest.mark.parametrize("crear_conexion", [conexion_registrada, conexion_c_registrada])
+def test_reejecutar_no_resetea_la_sentencia(crear_conexion):
+    log = []
+    conexion = crear_conexion(log)
+    sentencias = SentenciasPreparadas()
+    sql = "DELETE FROM Proyectos WHERE id_proyecto = %s"
+
+    for id_proyecto in (1, 2, 3):
+        cursor = sentencias.ejecutar(conexion, sql, (id_proyecto,))
+
+    assert log == ["prepare", "reset", ("execute", (1,)), ("execute", (2,)),
+                   ("execute", (3,))]
+    assert cursor.lastrowid == 7
+    assert sentencias.estadisticas()["reutilizaciones"] == 2
+
+
+def test_lecturas_del_pool_no_dejan_transaccion_abierta(conexiones):
+    db = Database(pool_max=1)
+
+    Proyecto.listar_proyectos(db)
+    Proyecto.listar_proyectos(db)
+
+    assert len(conexiones) == 1
+    assert conexiones[0].config["autocommit"] is True
+    assert conexiones[0].rollbacks == 0
+
+
+def test_iterar_bloques_descarta_la_conexion_sin_drenar(conexiones):
+    db = Database(pool_max=1)
+    with db.conexion() as connection:
+        pass
+    connection.filas = [(i,) for i in range(10)]
+
+    bloques = db.iterar_bloques("SELECT id FROM t", tamano_bloque=3)
+    next(bloques)
+    bloques.close()
+
+    assert connection.filas != []
+    assert getattr(connection, "cerrada", False)
+    assert db.estadisticas_pool()["descartadas"] == 1
+
+
+def test_transaccion_anidada_hace_un_solo_commit(conexiones):
+    db = Database(pool_max=2)
+
+    with db.transaccion():
+        Proyecto(db, nombre="a").crear_proyecto()
+        with db.transaccion():
+            Proyecto(db, nombre="b").crear_proyecto()
+        Proyecto(db, nombre="c").crear_proyecto()
+
+    assert len(conexiones) == 1
+    assert conexiones[0].inicios == 1
+    assert conexiones[0].commits == 1
+    assert conexiones[0].rollbacks == 0
+    assert len(conexiones[0].sentencias) == 3
+
+
+def test_error_capturado_revierte_y_aborta(conexiones, monkeypatch):
+    db = Database(pool_max=2)
+
+    def fallar(self, connection, sql, params=()):
+        raise Error("fallo simulado")
+
+    with pytest.raises(TransaccionAbortada):
+        with db.transaccion():
+            assert Proyecto(db, nombre="a").crear_proyecto() == 1
+            monkeypatch.setattr(Database, "preparada", fallar)
+            assert Proyecto(db, nombre="b").crear_proyecto() is None
+
+    assert conexiones[0].commits == 0
+    assert conexiones[0].rollbacks == 1
+
+
+def test_revertir_limpia_las_caches(conexiones):
+    db = Database(pool_max=2)
+    Empleados.cache.guardar(1, (1, "Ana", b"", b"", b"", None, 100.0))
+    Usuario.roles.guardar(1, "admin")
+
+    with pytest.raises(ValueError):
+        with db.transaccion():
+            raise ValueError("falla")
+
+    assert Empleados.cache.obtener(1) is None
+    assert Usuario.roles.obtener(1) is None
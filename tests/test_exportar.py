@@ -0,0 +1,25 @@
+import struct
+
+from exportar import EscritorColumnar, leer_columnar
+
+
+def test_columnar_ida_y_vuelta(tmp_path):
+    ruta = str(tmp_path / "tabla.ecol")
+    columnas = ("id", "salario", "nombre", "blob")
+    bloques = [
+        [(1, 1500.5, "Ana", b"\x00\x01"), (2, None, "Ñandú", None)],
+        [(3, 99.0, None, b"")],
+    ]
+
+    escritor = EscritorColumnar(ruta)
+    for filas in bloques:
+        escritor.escribir_bloque(columnas, filas)
+    escritor.cerrar()
+
+    assert list(leer_columnar(ruta)) == [(list(columnas), filas) for filas in bloques]
+
+
+def test_columnar_usa_little_endian():
+    datos = EscritorColumnar._codificar("s", ["ab", None])
+    assert datos == b"\x00\x01" + struct.pack("<3I", 0, 2, 2) + b"ab"
+    assert EscritorColumnar._codificar("i", [1])[1:] == b"\x01" + b"\x00" * 7
@@ -0,0 +1,20 @@
+import json
+import time
+
+from indicadores import CacheIndicadores
+
+
+def test_cache_escribe_por_lotes_y_poda_las_vencidas(tmp_path):
+    ruta = tmp_path / "indicadores" / "cache.json"
+    cache = CacheIndicadores(ruta=str(ruta))
+    antigua = time.time() - CacheIndicadores.RETENCION - 1
+
+    cache.guardar("uf/2023-01-02", 35000.0)
+    cache.guardar("dolar/hoy", 900.0, vence=antigua)
+    assert not ruta.exists()
+
+    cache.guardar_cambios()
+
+    with open(ruta, encoding="utf-8") as archivo:
+        assert list(json.load(archivo)) == ["uf/2023-01-02"]
+    assert CacheIndicadores(ruta=str(ruta)).obtener("uf/2023-01-02") == (True, 35000.0)